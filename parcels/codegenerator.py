@@ -564,7 +564,7 @@ class LoopGenerator(object):
         # Generate type definition for particle type
         vdecl = []
         for v in self.ptype.variables:
-            if v.name is 'CGridIndexSet':
+            if v.name == 'CGridIndexSet':
                 vdecl.append(c.Pointer(c.POD(np.void, v.name)))
             else:
                 vdecl.append(c.POD(v.dtype, v.name))
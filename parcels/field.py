@@ -1,9 +1,12 @@
 from parcels.loggers import logger
 from scipy.interpolate import RegularGridInterpolator
-from collections import Iterable
+from scipy.ndimage import map_coordinates
+try:
+    from collections.abc import Iterable
+except ImportError:  # Python 2
+    from collections import Iterable
 from py import path
 import numpy as np
-import xarray
 from ctypes import Structure, c_int, c_float, POINTER, pointer
 from netCDF4 import Dataset, num2date
 from math import cos, pi
@@ -43,6 +46,17 @@ class TimeExtrapolationError(RuntimeError):
         super(TimeExtrapolationError, self).__init__(message)
 
 
+_deg2rad = pi / 180
+
+
+def _cos_deg(y):
+    """Cosine of latitude y (in degrees), using math.cos for scalar
+    samples and only falling back on numpy for arrays"""
+    if isinstance(y, np.ndarray):
+        return np.cos(y * _deg2rad)
+    return cos(y * _deg2rad)
+
+
 class UnitConverter(object):
     """ Interface class for spatial unit conversion during field sampling
         that performs no conversion.
@@ -89,10 +103,10 @@ class GeographicPolar(UnitConverter):
     target_unit = 'degree'
 
     def to_target(self, value, x, y, z):
-        return value / 1000. / 1.852 / 60. / cos(y * pi / 180)
+        return value / 1000. / 1.852 / 60. / _cos_deg(y)
 
     def to_source(self, value, x, y, z):
-        return value * 1000. * 1.852 * 60. * cos(y * pi / 180)
+        return value * 1000. * 1.852 * 60. * _cos_deg(y)
 
     def ccode_to_target(self, x, y, z):
         return "(1.0 / (1000. * 1.852 * 60. * cos(%s * M_PI / 180)))" % y
@@ -105,18 +119,21 @@ class GeographicSquare(UnitConverter):
     """ Square distance converter from geometric to geographic coordinates (m2 to degree2) """
     source_unit = 'm2'
     target_unit = 'degree2'
+    # Conversion factors are constant, so they are only computed once
+    factor = pow(1000. * 1.852 * 60., 2)
+    inv_factor = pow(1.0 / (1000.0 * 1.852 * 60.0), 2)
 
     def to_target(self, value, x, y, z):
-        return value / pow(1000. * 1.852 * 60., 2)
+        return value / self.factor
 
     def to_source(self, value, x, y, z):
-        return value * pow(1000. * 1.852 * 60., 2)
+        return value * self.factor
 
     def ccode_to_target(self, x, y, z):
-        return "pow(1.0 / (1000.0 * 1.852 * 60.0), 2)"
+        return repr(self.inv_factor)
 
     def ccode_to_source(self, x, y, z):
-        return "pow((1000.0 * 1.852 * 60.0), 2)"
+        return repr(self.factor)
 
 
 class GeographicPolarSquare(UnitConverter):
@@ -127,10 +144,10 @@ class GeographicPolarSquare(UnitConverter):
     target_unit = 'degree2'
 
     def to_target(self, value, x, y, z):
-        return value / pow(1000. * 1.852 * 60. * cos(y * pi / 180), 2)
+        return value / pow(1000. * 1.852 * 60. * _cos_deg(y), 2)
 
     def to_source(self, value, x, y, z):
-        return value * pow(1000. * 1.852 * 60. * cos(y * pi / 180), 2)
+        return value * pow(1000. * 1.852 * 60. * _cos_deg(y), 2)
 
     def ccode_to_target(self, x, y, z):
         return "pow(1.0 / (1000. * 1.852 * 60. * cos(%s * M_PI / 180)), 2)" % y
@@ -194,14 +211,19 @@ class Field(object):
         self.lat = self.grid.lat
         self.depth = self.grid.depth
         self.time = self.grid.time
-        if self.grid.mesh is 'flat' or (name not in self.unitconverters.keys()):
+        if self.grid.mesh == 'flat' or (name not in self.unitconverters.keys()):
             self.units = UnitConverter()
-        elif self.grid.mesh is 'spherical':
+        elif self.grid.mesh == 'spherical':
             self.units = self.unitconverters[name]
         else:
             raise ValueError("Unsupported mesh type. Choose either: 'spherical' or 'flat'")
         self.interp_method = interp_method
         self.fieldset = None
+        self._last_cell = (None, None)
+        self._time_bounds = None
+        self._spatial_interpolator = None
+        self._last_zi = None
+        self._last_ti = None
         if allow_time_extrapolation is None:
             self.allow_time_extrapolation = True if time is None else False
         else:
@@ -234,12 +256,14 @@ class Field(object):
                                       ('Field %s expecting a data shape of a [ydim, xdim], [zdim, ydim, xdim], [tdim, ydim, xdim] or [tdim, zdim, ydim, xdim]. Flag transpose=True could help to reorder the data.')
 
         # Hack around the fact that NaN and ridiculously large values
-        # propagate in SciPy's interpolators
+        # propagate in SciPy's interpolators.
+        # A single mask is accumulated so that the data is only written once
+        invalid = np.isnan(self.data)
         if vmin is not None:
-            self.data[self.data < vmin] = 0.
+            invalid |= self.data < vmin
         if vmax is not None:
-            self.data[self.data > vmax] = 0.
-        self.data[np.isnan(self.data)] = 0.
+            invalid |= self.data > vmax
+        np.copyto(self.data, 0., where=invalid)
 
         # Variable names in JIT code
         self.ccode_data = self.name
@@ -283,11 +307,11 @@ class Field(object):
                     warning = True
                 if warning:
                     logger.warning_once("You are defining a field name 'cosU', 'sinU', 'cosV' or 'sinV' which was not generated by Parcels. This field will be used to rotate UV velocity at interpolation")
+            timeslices = [filebuffer.time]
 
         # Concatenate time variable to determine overall dimension
         # across multiple files
-        timeslices = []
-        for fname in filenames:
+        for fname in filenames[1:]:
             with FileBuffer(fname, dimensions) as filebuffer:
                 timeslices.append(filebuffer.time)
         timeslices = np.array(timeslices)
@@ -306,9 +330,17 @@ class Field(object):
         depthdim = depth.size if len(depth.shape) == 1 else depth.shape[-3]
         latdim = lat.size if len(lat.shape) == 1 else lat.shape[-2]
         londim = lon.size if len(lon.shape) == 1 else lon.shape[-1]
-        data = np.empty((time.size, depthdim, latdim, londim), dtype=np.float32)
+        # Only the requested time steps are read from file
+        tinds = np.arange(time.size)[indices['time']] if 'time' in indices else np.arange(time.size)
+        data = np.empty((tinds.size, depthdim, latdim, londim), dtype=np.float32)
         ti = 0
         for tslice, fname in zip(timeslices, filenames):
+            inslice = (tinds >= ti) & (tinds < ti+len(tslice))
+            if not inslice.any():
+                ti += len(tslice)
+                continue
+            # netCDF4 needs sorted indices, so read each time step once and redistribute
+            indstime, tpositions = np.unique(tinds[inslice] - ti, return_inverse=True)
             with FileBuffer(fname, dimensions) as filebuffer:
                 depthsize = depth.size if len(depth.shape) == 1 else depth.shape[-3]
                 latsize = lat.size if len(lat.shape) == 1 else lat.shape[-2]
@@ -316,6 +348,7 @@ class Field(object):
                 filebuffer.indslat = indices['lat'] if 'lat' in indices else range(latsize)
                 filebuffer.indslon = indices['lon'] if 'lon' in indices else range(lonsize)
                 filebuffer.indsdepth = indices['depth'] if 'depth' in indices else range(depthsize)
+                filebuffer.indstime = list(indstime)
                 for inds in [filebuffer.indslat, filebuffer.indslon, filebuffer.indsdepth]:
                     if not isinstance(inds, list):
                         raise RuntimeError('Indices sur field subsetting need to be a list')
@@ -326,17 +359,18 @@ class Field(object):
                 else:
                     filebuffer.name = name
 
+                # The slab read from file is cast straight into the float32 buffer. Only
+                # re-order it (which makes an extra copy) if time indices repeat or are unsorted
                 if len(filebuffer.dataset[filebuffer.name].shape) == 2:
-                    data[ti:ti+len(tslice), 0, :, :] = filebuffer.data[:, :]
+                    data[inslice, 0, :, :] = filebuffer.data[:, :]
+                elif np.array_equal(tpositions, np.arange(len(tpositions))):
+                    data[inslice, ...] = filebuffer.data.reshape(data[inslice, ...].shape)
                 elif len(filebuffer.dataset[filebuffer.name].shape) == 3:
-                    data[ti:ti+len(tslice), 0, :, :] = filebuffer.data[:, :, :]
+                    data[inslice, 0, :, :] = filebuffer.data[tpositions, :, :]
                 else:
-                    data[ti:ti+len(tslice), :, :, :] = filebuffer.data[:, :, :, :]
+                    data[inslice, :, :, :] = filebuffer.data[tpositions, :, :, :]
             ti += len(tslice)
-        # Time indexing after the fact only
-        if 'time' in indices:
-            time = time[indices['time']]
-            data = data[indices['time'], :, :, :]
+        time = time[tinds]
         if time.size == 1 and time[0] is None:
             time[0] = 0
         if len(lon.shape) == 1:
@@ -372,6 +406,26 @@ class Field(object):
         meridional = fieldset.V.units.to_target(meridional, x, y, z)
         return (zonal, meridional)
 
+    def getUV_batch(self, time, x, y, z):
+        """Array version of :func:`getUV`, sampling the velocities at all
+        positions at once with :func:`eval_batch`"""
+        fieldset = self.fieldset
+        U = fieldset.U.eval_batch(time, x, y, z, False)
+        V = fieldset.V.eval_batch(time, x, y, z, False)
+        if fieldset.U.grid.gtype in [GridCode.RectilinearZGrid, GridCode.RectilinearSGrid]:
+            zonal = U
+            meridional = V
+        else:
+            cosU = fieldset.cosU.eval_batch(time, x, y, z, False)
+            sinU = fieldset.sinU.eval_batch(time, x, y, z, False)
+            cosV = fieldset.cosV.eval_batch(time, x, y, z, False)
+            sinV = fieldset.sinV.eval_batch(time, x, y, z, False)
+            zonal = U * cosU - V * sinV
+            meridional = U * sinU + V * cosV
+        zonal = fieldset.U.units.to_target(zonal, x, y, z)
+        meridional = fieldset.V.units.to_target(meridional, x, y, z)
+        return (zonal, meridional)
+
     def __getitem__(self, key):
         if self.name == 'UV':
             return self.getUV(*key)
@@ -382,15 +436,19 @@ class Field(object):
                 Currently only works for Rectilinear Grids"""
         if not self.grid.cell_edge_sizes:
             if self.grid.gtype in (GridCode.RectilinearZGrid, GridCode.RectilinearSGrid):
-                self.grid.cell_edge_sizes['x'] = np.zeros((self.grid.ydim, self.grid.xdim), dtype=np.float32)
-                self.grid.cell_edge_sizes['y'] = np.zeros((self.grid.ydim, self.grid.xdim), dtype=np.float32)
-
-                x_conv = GeographicPolar() if self.grid.mesh is 'spherical' else UnitConverter()
-                y_conv = Geographic() if self.grid.mesh is 'spherical' else UnitConverter()
-                for y, (lat, dy) in enumerate(zip(self.grid.lat, np.gradient(self.grid.lat))):
-                    for x, (lon, dx) in enumerate(zip(self.grid.lon, np.gradient(self.grid.lon))):
-                        self.grid.cell_edge_sizes['x'][y, x] = x_conv.to_source(dx, lon, lat, self.grid.depth[0])
-                        self.grid.cell_edge_sizes['y'][y, x] = y_conv.to_source(dy, lon, lat, self.grid.depth[0])
+                shape = (self.grid.ydim, self.grid.xdim)
+                x_conv = GeographicPolar() if self.grid.mesh == 'spherical' else UnitConverter()
+                y_conv = Geographic() if self.grid.mesh == 'spherical' else UnitConverter()
+                # Unit conversions only depend on latitude, so convert a (lat, lon)
+                # broadcast of the grid spacings in one go
+                lon = self.grid.lon[np.newaxis, :].astype(np.float64)
+                lat = self.grid.lat[:, np.newaxis].astype(np.float64)
+                dx = np.gradient(self.grid.lon)[np.newaxis, :]
+                dy = np.gradient(self.grid.lat)[:, np.newaxis]
+                dx = x_conv.to_source(dx, lon, lat, self.grid.depth[0])
+                dy = y_conv.to_source(dy, lon, lat, self.grid.depth[0])
+                self.grid.cell_edge_sizes['x'] = np.broadcast_to(dx, shape).astype(np.float32)
+                self.grid.cell_edge_sizes['y'] = np.broadcast_to(dy, shape).astype(np.float32)
                 self.cell_edge_sizes = self.grid.cell_edge_sizes
             else:
                 logger.error(('Field.cell_edge_sizes() not implemented for ', self.grid.gtype, 'grids.',
@@ -411,8 +469,11 @@ class Field(object):
                 on the same Grid as the original Field, using numpy.gradient() method"""
         if not self.grid.cell_edge_sizes:
             self.calc_cell_edge_sizes()
-        dFdy = np.gradient(self.data, axis=-2) / self.grid.cell_edge_sizes['y']
-        dFdx = np.gradient(self.data, axis=-1) / self.grid.cell_edge_sizes['x']
+        # Divide in place to avoid allocating a second full-field temporary
+        dFdy = np.gradient(self.data, axis=-2)
+        dFdy /= self.grid.cell_edge_sizes['y']
+        dFdx = np.gradient(self.data, axis=-1)
+        dFdx /= self.grid.cell_edge_sizes['x']
         return dFdx, dFdy
 
     def interpolator2D_scipy(self, ti, z_idx=None):
@@ -429,20 +490,47 @@ class Field(object):
                                        bounds_error=False, fill_value=np.nan,
                                        method=self.interp_method)
 
-    def interpolator3D_rectilinear_z(self, idx, z, y, x):
+    @staticmethod
+    def bilinear_weights(xsi, eta):
+        """Weights of the (yi, xi), (yi, xi+1), (yi+1, xi+1) and (yi+1, xi) corners
+        of a cell, given the relative coordinates xsi and eta in that cell"""
+        return ((1-xsi)*(1-eta), xsi*(1-eta), xsi*eta, (1-xsi)*eta)
+
+    def bilinear_interpolation(self, ti, zi, yi, xi, weights):
+        """Bilinear interpolation of the field data at time index ti and
+        depth index zi (None for 2D fields) within cell (yi, xi), using the
+        corner weights from :func:`bilinear_weights`.
+        The corners are read directly, without creating slice views"""
+        data = self.data
+        if zi is None:
+            c00, c10, c11, c01 = data[ti, yi, xi], data[ti, yi, xi+1], data[ti, yi+1, xi+1], data[ti, yi+1, xi]
+        else:
+            c00, c10, c11, c01 = data[ti, zi, yi, xi], data[ti, zi, yi, xi+1], data[ti, zi, yi+1, xi+1], data[ti, zi, yi+1, xi]
+        w00, w10, w11, w01 = weights
+        return w00 * c00 + w10 * c10 + w11 * c11 + w01 * c01
+
+    def interpolator3D_rectilinear_z(self, idx, z, y, x, time=None):
         """Scipy implementation of 3D interpolation, by first interpolating
         in horizontal, then in the vertical"""
 
         zdx = self.depth_index(z, y, x)
-        f0 = self.interpolator2D_scipy(idx, z_idx=zdx)((y, x))
-        f1 = self.interpolator2D_scipy(idx, z_idx=zdx + 1)((y, x))
+        if self.interp_method == 'linear':
+            # Bilinear weights are shared by both depth levels, so there is
+            # no need to build a scipy interpolator per level
+            (xsi, eta, _, xi, yi, _) = self.search_indices(x, y, z, 0, 0, search2D=True)
+            weights = self.bilinear_weights(xsi, eta)
+            f0 = self.bilinear_interpolation(idx, zdx, yi, xi, weights)
+            f1 = self.bilinear_interpolation(idx, zdx + 1, yi, xi, weights)
+        else:
+            f0 = self.interpolator2D_scipy(idx, z_idx=zdx)((y, x))
+            f1 = self.interpolator2D_scipy(idx, z_idx=zdx + 1)((y, x))
         z0 = self.grid.depth[zdx]
         z1 = self.grid.depth[zdx + 1]
         if z < z0 or z > z1:
             raise FieldSamplingError(x, y, z, field=self)
-        if self.interp_method is 'nearest':
+        if self.interp_method == 'nearest':
             return f0 if z - z0 < z1 - z else f1
-        elif self.interp_method is 'linear':
+        elif self.interp_method == 'linear':
             return f0 + (f1 - f0) * ((z - z0) / (z1 - z0))
         else:
             raise RuntimeError(self.interp_method+"is not implemented for 3D grids")
@@ -450,11 +538,8 @@ class Field(object):
     def search_indices_vertical_z(self, z):
         grid = self.grid
         z = np.float32(z)
-        depth_index = grid.depth <= z
-        if z >= grid.depth[-1]:
-            zi = len(grid.depth) - 2
-        else:
-            zi = depth_index.argmin() - 1 if z >= grid.depth[0] else 0
+        zi = self.search_index_sorted(grid.depth, z, self._last_zi)
+        self._last_zi = zi
         zeta = (z-grid.depth[zi]) / (grid.depth[zi+1]-grid.depth[zi])
         return (zi, zeta)
 
@@ -480,11 +565,7 @@ class Field(object):
                 xsi*eta * grid.depth[xi+1, yi+1, :] + \
                 (1-xsi)*eta * grid.depth[xi, yi+1, :]
         z = np.float32(z)
-        depth_index = depth_vector <= z
-        if z >= depth_vector[-1]:
-            zi = len(depth_vector) - 2
-        else:
-            zi = depth_index.argmin() - 1 if z >= depth_vector[0] else 0
+        zi = self.search_index_sorted(depth_vector, z)
         if z < depth_vector[zi] or z > depth_vector[zi+1]:
             raise FieldSamplingError(x, y, z, field=self)
         zeta = (z - depth_vector[zi]) / (depth_vector[zi+1]-depth_vector[zi])
@@ -503,19 +584,32 @@ class Field(object):
                 xi = dim-2
         return xi
 
+    @staticmethod
+    def search_index_sorted(coords, value, hint=None):
+        """Find the index i of the cell [coords[i], coords[i+1]] containing value,
+        using a binary search on the (monotonically increasing) coords vector.
+        value can be a scalar or a numpy array of values
+
+        :param hint: Optional (scalar) index of a previously found cell. That cell
+               and its two neighbours are checked before falling back on the binary search"""
+        if hint is not None:
+            ncells = len(coords) - 1
+            for i in (hint, hint + 1, hint - 1):
+                if 0 <= i < ncells and coords[i] <= value < coords[i+1]:
+                    return i
+        index = np.searchsorted(coords, value, side='right') - 1
+        return np.clip(index, 0, len(coords) - 2)
+
     def search_indices_rectilinear(self, x, y, z, ti=-1, time=-1, search2D=False):
         grid = self.grid
-        xi = yi = -1
-        lon_index = grid.lon <= x
+        # Compute the relative coordinates in double precision, as scipy does
+        x = np.float64(x)
+        y = np.float64(y)
 
-        if grid.mesh is not 'spherical':
+        if grid.mesh != 'spherical':
             if x < grid.lon[0] or x > grid.lon[-1]:
                 raise FieldSamplingError(x, y, z, field=self)
-            lon_index = grid.lon <= x
-            if lon_index.all():
-                xi = len(grid.lon) - 2
-            else:
-                xi = lon_index.argmin() - 1 if lon_index.any() else 0
+            xi = self.search_index_sorted(grid.lon, x, self._last_cell[0])
             xsi = (x-grid.lon[xi]) / (grid.lon[xi+1]-grid.lon[xi])
         else:
             lon_fixed = grid.lon
@@ -524,20 +618,14 @@ class Field(object):
                 lon_fixed -= 360
             if x < lon_fixed[0] or x > lon_fixed[-1]:
                 raise FieldSamplingError(x, y, z, field=self)
-            lon_index = lon_fixed <= x
-            if lon_index.all():
-                xi = len(lon_fixed) - 2
-            else:
-                xi = lon_index.argmin() - 1 if lon_index.any() else 0
+            xi = self.search_index_sorted(lon_fixed, x, self._last_cell[0])
             xsi = (x-lon_fixed[xi]) / (lon_fixed[xi+1]-lon_fixed[xi])
 
         if y < grid.lat[0] or y > grid.lat[-1]:
             raise FieldSamplingError(x, y, z, field=self)
-        lat_index = grid.lat <= y
-        if lat_index.all():
-            yi = len(grid.lat) - 2
-        else:
-            yi = lat_index.argmin() - 1 if lat_index.any() else 0
+        yi = self.search_index_sorted(grid.lat, y, self._last_cell[1])
+        # Consecutive samples are often in the same cell, so remember it
+        self._last_cell = (xi, yi)
 
         eta = (y-grid.lat[yi]) / (grid.lat[yi+1]-grid.lat[yi])
 
@@ -560,27 +648,31 @@ class Field(object):
     def search_indices_curvilinear(self, x, y, z, xi, yi, ti=-1, time=-1, search2D=False):
         xsi = eta = -1
         grid = self.grid
-        invA = np.array([[1, 0, 0, 0],
-                         [-1, 1, 0, 0],
-                         [-1, 0, 0, 1],
-                         [1, -1, 1, -1]])
+        # Local references for the arrays and constants used in the search loop
+        lon, lat = grid.lon, grid.lat
+        spherical = grid.mesh == 'spherical'
+        xdim, ydim = grid.xdim, grid.ydim
         maxIterSearch = 1e6
         it = 0
         while xsi < 0 or xsi > 1 or eta < 0 or eta > 1:
-            px = np.array([grid.lon[yi, xi], grid.lon[yi, xi+1], grid.lon[yi+1, xi+1], grid.lon[yi+1, xi]])
-            if grid.mesh == 'spherical':
-                px = np.where(px - x > 180, px-360, px)
-                px = np.where(-px + x > 180, px+360, px)
-            py = np.array([grid.lat[yi, xi], grid.lat[yi, xi+1], grid.lat[yi+1, xi+1], grid.lat[yi+1, xi]])
-            a = np.dot(invA, px)
-            b = np.dot(invA, py)
+            px = [lon[yi, xi], lon[yi, xi+1], lon[yi+1, xi+1], lon[yi+1, xi]]
+            if spherical:
+                # Unwrap the 4 corners as scalars, np.where is overkill here
+                px = [p-360 if p - x > 180 else (p+360 if -p + x > 180 else p) for p in px]
+            # Bilinear coefficients in double precision, i.e. the product of the corner
+            # coordinates with invA = [[1, 0, 0, 0], [-1, 1, 0, 0], [-1, 0, 0, 1], [1, -1, 1, -1]]
+            p0, p1, p2, p3 = [float(p) for p in px]
+            a = [p0, p1 - p0, p3 - p0, p0 - p1 + p2 - p3]
+            p0, p1, p2, p3 = [float(lat[yi, xi]), float(lat[yi, xi+1]),
+                              float(lat[yi+1, xi+1]), float(lat[yi+1, xi])]
+            b = [p0, p1 - p0, p3 - p0, p0 - p1 + p2 - p3]
 
             aa = a[3]*b[2] - a[2]*b[3]
             if abs(aa) < 1e-12:  # Rectilinear cell, or quasi
                 xsi = ((x-px[0]) / (px[1]-px[0])
                        + (x-px[3]) / (px[2]-px[3])) * .5
-                eta = ((y-grid.lat[yi, xi]) / (grid.lat[yi+1, xi]-grid.lat[yi, xi])
-                       + (y-grid.lat[yi, xi+1]) / (grid.lat[yi+1, xi+1]-grid.lat[yi, xi+1])) * .5
+                eta = ((y-lat[yi, xi]) / (lat[yi+1, xi]-lat[yi, xi])
+                       + (y-lat[yi, xi+1]) / (lat[yi+1, xi+1]-lat[yi, xi+1])) * .5
             else:
                 bb = a[3]*b[0] - a[0]*b[3] + a[1]*b[2] - a[2]*b[1] + x*b[3] - y*a[3]
                 cc = a[1]*b[0] - a[0]*b[1] + x*b[1] - y*a[1]
@@ -591,7 +683,7 @@ class Field(object):
                     xsi = (x-a[0]-a[2]*eta) / (a[1]+a[3]*eta)
             if xsi < 0 and eta < 0 and xi == 0 and yi == 0:
                 raise FieldSamplingError(x, y, 0, field=self)
-            if xsi > 1 and eta > 1 and xi == grid.xdim-1 and yi == grid.ydim-1:
+            if xsi > 1 and eta > 1 and xi == xdim-1 and yi == ydim-1:
                 raise FieldSamplingError(x, y, 0, field=self)
             if xsi < 0:
                 xi -= 1
@@ -601,12 +693,13 @@ class Field(object):
                 yi -= 1
             elif eta > 1:
                 yi += 1
-            xi = self.fix_i_index(xi, grid.xdim, grid.mesh == 'spherical')
-            yi = self.fix_i_index(yi, grid.ydim, False)
+            xi = self.fix_i_index(xi, xdim, spherical)
+            yi = self.fix_i_index(yi, ydim, False)
             it += 1
             if it > maxIterSearch:
                 print('Correct cell not found after %d iterations' % maxIterSearch)
                 raise FieldSamplingError(x, y, 0, field=self)
+        self._last_cell = (xi, yi)
 
         if grid.zdim > 1 and not search2D:
             if grid.gtype == GridCode.CurvilinearZGrid:
@@ -624,48 +717,58 @@ class Field(object):
         return (xsi, eta, zeta, xi, yi, zi)
 
     def search_indices(self, x, y, z, xi, yi, ti=-1, time=-1, search2D=False):
-        if self.grid.gtype in [GridCode.RectilinearSGrid, GridCode.RectilinearZGrid]:
-            return self.search_indices_rectilinear(x, y, z, ti, time, search2D=search2D)
+        grid = self.grid
+        # eval interpolates the two time snapshots around time at the same
+        # position, so the last search is reused unless the position or the
+        # grid axes changed. Only time-varying s-grid depths depend on ti.
+        # The search is stored on the Grid, so that Fields sharing a Grid
+        # (e.g. U, V and W sampled at the same position) also share it
+        key = (x, y, z, search2D) if grid.z4d != 1 else (x, y, z, search2D, ti, time)
+        last = grid.last_search
+        if last is not None and last[0] == key and last[1] is grid.lon \
+           and last[2] is grid.lat and last[3] is grid.depth:
+            return last[4]
+        if grid.gtype in [GridCode.RectilinearSGrid, GridCode.RectilinearZGrid]:
+            result = self.search_indices_rectilinear(x, y, z, ti, time, search2D=search2D)
         else:
-            return self.search_indices_curvilinear(x, y, z, xi, yi, ti, time, search2D=search2D)
-
-    def interpolator2D(self, ti, z, y, x):
-        xi = 0
-        yi = 0
+            result = self.search_indices_curvilinear(x, y, z, xi, yi, ti, time, search2D=search2D)
+        grid.last_search = (key, grid.lon, grid.lat, grid.depth, result)
+        return result
+
+    def search_start(self, xi, yi):
+        """Starting cell for the curvilinear search: the cell of the previous
+        sample on this Field if there is one, since consecutive samples tend
+        to be close to each other, otherwise (xi, yi)"""
+        lastxi, lastyi = self._last_cell
+        if lastxi is not None and lastxi < self.grid.xdim-1 and lastyi < self.grid.ydim-1:
+            return lastxi, lastyi
+        return xi, yi
+
+    def interpolator2D(self, ti, z, y, x, time=None):
+        (xi, yi) = self.search_start(0, 0)
         (xsi, eta, trash, xi, yi, trash) = self.search_indices(x, y, z, xi, yi)
-        if self.interp_method is 'nearest':
-            xii = xi if xsi <= .5 else xi+1
-            yii = yi if eta <= .5 else yi+1
+        if self.interp_method == 'nearest':
+            xii = xi + int(xsi > .5)
+            yii = yi + int(eta > .5)
             return self.data[ti, yii, xii]
-        elif self.interp_method is 'linear':
-            val = (1-xsi)*(1-eta) * self.data[ti, yi, xi] + \
-                xsi*(1-eta) * self.data[ti, yi, xi+1] + \
-                xsi*eta * self.data[ti, yi+1, xi+1] + \
-                (1-xsi)*eta * self.data[ti, yi+1, xi]
-            return val
+        elif self.interp_method == 'linear':
+            return self.bilinear_interpolation(ti, None, yi, xi, self.bilinear_weights(xsi, eta))
         else:
             raise RuntimeError(self.interp_method+"is not implemented for 3D grids")
 
     def interpolator3D(self, ti, z, y, x, time):
-        xi = int(self.grid.xdim / 2)
-        yi = int(self.grid.ydim / 2)
+        (xi, yi) = self.search_start(int(self.grid.xdim / 2), int(self.grid.ydim / 2))
         (xsi, eta, zeta, xi, yi, zi) = self.search_indices(x, y, z, xi, yi, ti, time)
-        if self.interp_method is 'nearest':
-            xii = xi if xsi <= .5 else xi+1
-            yii = yi if eta <= .5 else yi+1
-            zii = zi if zeta <= .5 else zi+1
+        if self.interp_method == 'nearest':
+            xii = xi + int(xsi > .5)
+            yii = yi + int(eta > .5)
+            zii = zi + int(zeta > .5)
             return self.data[ti, zii, yii, xii]
-        elif self.interp_method is 'linear':
-            data = self.data[ti, zi, :, :]
-            f0 = (1-xsi)*(1-eta) * data[yi, xi] + \
-                xsi*(1-eta) * data[yi, xi+1] + \
-                xsi*eta * data[yi+1, xi+1] + \
-                (1-xsi)*eta * data[yi+1, xi]
-            data = self.data[ti, zi+1, :, :]
-            f1 = (1-xsi)*(1-eta) * data[yi, xi] + \
-                xsi*(1-eta) * data[yi, xi+1] + \
-                xsi*eta * data[yi+1, xi+1] + \
-                (1-xsi)*eta * data[yi+1, xi]
+        elif self.interp_method == 'linear':
+            # The horizontal weights are the same for both depth levels
+            weights = self.bilinear_weights(xsi, eta)
+            f0 = self.bilinear_interpolation(ti, zi, yi, xi, weights)
+            f1 = self.bilinear_interpolation(ti, zi+1, yi, xi, weights)
             return (1-zeta) * f0 + zeta * f1
         else:
             raise RuntimeError(self.interp_method+"is not implemented for 3D grids")
@@ -682,64 +785,95 @@ class Field(object):
         t1 = self.grid.time[ti+1]
         f0 = self.data[ti, :]
         f1 = self.data[ti+1, :]
-        return f0 + (f1 - f0) * ((time - t0) / (t1 - t0))
-
-    def spatial_interpolation(self, ti, z, y, x, time):
-        """Interpolate horizontal field values using a SciPy interpolator"""
-
-        if self.grid.gtype is GridCode.RectilinearZGrid:  # The only case where we use scipy interpolation
-            if self.grid.zdim == 1:
-                val = self.interpolator2D_scipy(ti)((y, x))
+        # Single output buffer, instead of a temporary for every operation
+        out = np.subtract(f1, f0)
+        out *= (time - t0) / (t1 - t0)
+        out += f0
+        return out
+
+    def spatial_interpolator(self):
+        """Return the spatial interpolation method for the grid type,
+        dimensionality and interp_method of this Field. These are invariant
+        while sampling, so the choice is cached until the grid or
+        interp_method change. All methods take (ti, z, y, x, time)"""
+        cached = self._spatial_interpolator
+        if cached is not None and cached[0] is self.grid and cached[1] == self.interp_method:
+            return cached[2]
+
+        if self.grid.gtype is GridCode.RectilinearZGrid:  # Scipy interpolation is only used here for 'nearest'
+            if self.grid.zdim == 1 and self.interp_method == 'linear':
+                interpolator = self.interpolator2D
+            elif self.grid.zdim == 1:
+                def interpolator(ti, z, y, x, time):
+                    return self.interpolator2D_scipy(ti)((y, x))
             else:
-                val = self.interpolator3D_rectilinear_z(ti, z, y, x)
+                interpolator = self.interpolator3D_rectilinear_z
         elif self.grid.gtype in [GridCode.RectilinearSGrid, GridCode.CurvilinearZGrid, GridCode.CurvilinearSGrid]:
             if self.grid.zdim == 1:
-                val = self.interpolator2D(ti, z, y, x)
+                interpolator = self.interpolator2D
             else:
-                val = self.interpolator3D(ti, z, y, x, time)
+                interpolator = self.interpolator3D
         else:
             raise RuntimeError("Only RectilinearZGrid, RectilinearSGrid and CRectilinearGrid grids are currently implemented")
-        if np.isnan(val):
+        self._spatial_interpolator = (self.grid, self.interp_method, interpolator)
+        return interpolator
+
+    def spatial_interpolation(self, ti, z, y, x, time):
+        """Interpolate horizontal field values using a SciPy interpolator"""
+
+        val = self.spatial_interpolator()(ti, z, y, x, time)
+        if math.isnan(val):
             # Detect Out-of-bounds sampling and raise exception
             raise FieldSamplingError(x, y, z, field=self)
         else:
             return val
 
+    def time_bounds(self):
+        """Return the first and last time of the grid, and their difference,
+        as Python floats. These are cached for as long as the grid keeps
+        the same time array (Grid.advancetime replaces it)"""
+        if self._time_bounds is None or self._time_bounds[0] is not self.grid.time:
+            t0 = float(self.grid.time[0])
+            tN = float(self.grid.time[-1])
+            self._time_bounds = (self.grid.time, t0, tN, tN - t0)
+        return self._time_bounds[1:]
+
     def time_index(self, time):
         """Find the index in the time array associated with a given time
 
         Note that we normalize to either the first or the last index
         if the sampled value is outside the time value range.
         """
-        if not self.time_periodic and not self.allow_time_extrapolation and (time < self.grid.time[0] or time > self.grid.time[-1]):
+        t0, tN, tperiod = self.time_bounds()
+        if not self.time_periodic and not self.allow_time_extrapolation and (time < t0 or time > tN):
             raise TimeExtrapolationError(time, field=self)
-        time_index = self.grid.time <= time
-        if self.time_periodic:
-            if time_index.all() or np.logical_not(time_index).all():
-                periods = math.floor((time-self.grid.time[0])/(self.grid.time[-1]-self.grid.time[0]))
-                time -= periods*(self.grid.time[-1]-self.grid.time[0])
-                time_index = self.grid.time <= time
-                ti = time_index.argmin() - 1 if time_index.any() else 0
-                return (ti, periods)
-            return (time_index.argmin() - 1 if time_index.any() else 0, 0)
-        if time_index.all():
-            # If given time > last known field time, use
-            # the last field frame without interpolation
-            return (len(self.grid.time) - 1, 0)
-        else:
-            return (time_index.argmin() - 1 if time_index.any() else 0, 0)
+        # Consecutive samples are mostly in the same time interval
+        ti = self._last_ti
+        gtime = self.grid.time
+        if ti is not None and ti < len(gtime) - 1 and gtime[ti] <= time < gtime[ti+1]:
+            return (ti, 0)
+        # Number of time steps <= time, through a binary search
+        nbefore = np.searchsorted(self.grid.time, time, side='right')
+        if self.time_periodic and (nbefore == 0 or nbefore == len(self.grid.time)):
+            periods = math.floor((time-t0)/tperiod)
+            time -= periods*tperiod
+            nbefore = np.searchsorted(self.grid.time, time, side='right')
+            return (max(nbefore - 1, 0), periods)
+        # If given time > last known field time, nbefore - 1 is the
+        # last field frame, which is then used without interpolation
+        self._last_ti = max(nbefore - 1, 0)
+        return (self._last_ti, 0)
 
     def depth_index(self, depth, lat, lon):
         """Find the index in the depth array associated with a given depth"""
         if depth > self.grid.depth[-1]:
             raise FieldSamplingError(lon, lat, depth, field=self)
-        depth_index = self.grid.depth <= depth
-        if depth_index.all():
-            # If given depth == largest field depth, use the second-last
-            # field depth (as zidx+1 needed in interpolation)
-            return len(self.grid.depth) - 2
-        else:
-            return depth_index.argmin() - 1 if depth_index.any() else 0
+        # If given depth == largest field depth, use the second-last
+        # field depth (as zidx+1 needed in interpolation).
+        # Kernels mostly sample at the particle depth, so start from the last level
+        zi = self.search_index_sorted(self.grid.depth, depth, self._last_zi)
+        self._last_zi = zi
+        return zi
 
     def eval(self, time, x, y, z, applyConversion=True):
         """Interpolate field values in space and time.
@@ -749,7 +883,8 @@ class Field(object):
         scipy.interpolate to perform spatial interpolation.
         """
         (ti, periods) = self.time_index(time)
-        time -= periods*(self.grid.time[-1]-self.grid.time[0])
+        if periods:
+            time -= periods*self.time_bounds()[2]
         if ti < self.grid.tdim-1 and time > self.grid.time[ti]:
             f0 = self.spatial_interpolation(ti, z, y, x, time)
             f1 = self.spatial_interpolation(ti + 1, z, y, x, time)
@@ -767,21 +902,91 @@ class Field(object):
         else:
             return value
 
+    def eval_batch(self, time, x, y, z, applyConversion=True):
+        """Interpolate field values in space and time at many positions at once.
+
+        :param time: Time(s) to sample at (scalar or array)
+        :param x: Array of zonal positions
+        :param y: Array of meridional positions
+        :param z: Array of vertical positions
+
+        For linear interpolation on a RectilinearZGrid, the
+        positions are mapped to fractional grid indices and the field is
+        sampled with a single call to :func:`scipy.ndimage.map_coordinates`.
+        For nearest interpolation, the nearest nodes are gathered with fancy
+        indexing and interpolated linearly in time, as in :func:`eval`.
+        Other grids fall back on :func:`eval` for each position.
+        """
+        x, y, z = (np.atleast_1d(np.asarray(c, dtype=np.float64)) for c in (x, y, z))
+        time = np.asarray(time, dtype=np.float64) * np.ones_like(x)
+        grid = self.grid
+        # np.interp below needs strictly increasing axes to build the fractional indices
+        if grid.gtype is not GridCode.RectilinearZGrid or self.interp_method not in ['linear', 'nearest'] \
+           or np.any(np.diff(grid.lon) <= 0) or np.any(np.diff(grid.lat) <= 0) \
+           or (grid.zdim > 1 and np.any(np.diff(grid.depth) <= 0)):
+            return np.array([self.eval(t, xp, yp, zp, applyConversion)
+                             for t, xp, yp, zp in zip(time, x, y, z)])
+
+        if self.time_periodic:
+            time = grid.time[0] + np.mod(time - grid.time[0], grid.time[-1] - grid.time[0])
+        elif not self.allow_time_extrapolation:
+            outside = (time < grid.time[0]) | (time > grid.time[-1])
+            if outside.any():
+                raise TimeExtrapolationError(time[outside][0], field=self)
+
+        def fractional_index(coords, values):
+            return np.interp(values, coords, np.arange(len(coords), dtype=np.float64))
+
+        outside = (x < grid.lon[0]) | (x > grid.lon[-1]) | (y < grid.lat[0]) | (y > grid.lat[-1])
+        if grid.zdim > 1:
+            outside |= (z < grid.depth[0]) | (z > grid.depth[-1])
+        if outside.any():
+            i = np.argmax(outside)
+            raise FieldSamplingError(x[i], y[i], z[i], field=self)
+
+        coords = [fractional_index(grid.time, time) if grid.tdim > 1 else np.zeros_like(x)]
+        if grid.zdim > 1:
+            coords.append(fractional_index(grid.depth, z))
+        coords += [fractional_index(grid.lat, y), fractional_index(grid.lon, x)]
+        if self.interp_method == 'linear':
+            # Sample in double precision, as the scalar bilinear interpolation does
+            value = map_coordinates(self.data, np.array(coords), output=np.float64,
+                                    order=1, mode='nearest', prefilter=False)
+        else:
+            def nearest_index(fidx, dim, tie_up=False):
+                i = np.clip(np.floor(fidx).astype(np.int64), 0, dim - 2)
+                return i + ((fidx - i >= .5) if tie_up else (fidx - i > .5))
+            spatial = [nearest_index(coords[-2], grid.ydim), nearest_index(coords[-1], grid.xdim)]
+            if grid.zdim > 1:
+                spatial.insert(0, nearest_index(coords[1], grid.zdim, tie_up=True))
+            if grid.tdim > 1:
+                ti = np.clip(np.floor(coords[0]).astype(np.int64), 0, grid.tdim - 2)
+                f0 = self.data[tuple([ti] + spatial)].astype(np.float64)
+                f1 = self.data[tuple([ti + 1] + spatial)].astype(np.float64)
+                value = f0 + (f1 - f0) * (coords[0] - ti)
+            else:
+                value = self.data[tuple([np.zeros_like(spatial[0])] + spatial)].astype(np.float64)
+
+        if applyConversion:
+            return self.units.to_target(value, x, y, z)
+        else:
+            return value
+
     def ccode_evalUV(self, varU, varV, t, x, y, z):
         # Casting interp_methd to int as easier to pass on in C-code
 
         gridset = self.fieldset.gridset
-        uiGrid = gridset.grids.index(self.fieldset.U.grid)
-        viGrid = gridset.grids.index(self.fieldset.V.grid)
+        uiGrid = gridset.grid_index(self.fieldset.U.grid)
+        viGrid = gridset.grid_index(self.fieldset.V.grid)
         if self.fieldset.U.grid.gtype in [GridCode.RectilinearZGrid, GridCode.RectilinearSGrid]:
             return "temporal_interpolationUV(%s, %s, %s, %s, U, V, particle->CGridIndexSet, %s, %s, &%s, &%s, %s)" \
                 % (x, y, z, t,
                    uiGrid, viGrid, varU, varV, self.fieldset.U.interp_method.upper())
         else:
-            cosuiGrid = gridset.grids.index(self.fieldset.cosU.grid)
-            sinuiGrid = gridset.grids.index(self.fieldset.sinU.grid)
-            cosviGrid = gridset.grids.index(self.fieldset.cosV.grid)
-            sinviGrid = gridset.grids.index(self.fieldset.sinV.grid)
+            cosuiGrid = gridset.grid_index(self.fieldset.cosU.grid)
+            sinuiGrid = gridset.grid_index(self.fieldset.sinU.grid)
+            cosviGrid = gridset.grid_index(self.fieldset.cosV.grid)
+            sinviGrid = gridset.grid_index(self.fieldset.sinV.grid)
             return "temporal_interpolationUVrotation(%s, %s, %s, %s, U, V, cosU, sinU, cosV, sinV, particle->CGridIndexSet, %s, %s, %s, %s, %s, %s, &%s, &%s, %s)" \
                 % (x, y, z, t,
                    uiGrid, viGrid, cosuiGrid, sinuiGrid, cosviGrid, sinviGrid,
@@ -790,7 +995,7 @@ class Field(object):
     def ccode_eval(self, var, t, x, y, z):
         # Casting interp_methd to int as easier to pass on in C-code
         gridset = self.fieldset.gridset
-        iGrid = gridset.grids.index(self.grid)
+        iGrid = gridset.grid_index(self.grid)
         return "temporal_interpolation(%s, %s, %s, %s, %s, %s, %s, &%s, %s)" \
             % (x, y, z, t, self.name, "particle->CGridIndexSet", iGrid, var,
                self.interp_method.upper())
@@ -841,7 +1046,7 @@ class Field(object):
         if with_particles or (not animation):
             show_time = self.grid.time[0] if show_time is None else show_time
             (idx, periods) = self.time_index(show_time)
-            show_time -= periods*(self.grid.time[-1]-self.grid.time[0])
+            show_time -= periods*self.time_bounds()[2]
             if self.grid.time.size > 1:
                 data = np.squeeze(self.temporal_interpolate_fullfield(idx, show_time))
             else:
@@ -884,27 +1089,26 @@ class Field(object):
         """
         if self.name == 'UV':
             return
+        if not (zonal or meridional):
+            return
+        # Allocate the haloed array once, and fill it by copying the
+        # interior and then the periodic halo slices
+        hx = halosize if zonal else 0
+        hy = halosize if meridional else 0
+        ydim, xdim = self.data.shape[-2:]
+        data = np.empty(self.data.shape[:-2] + (ydim + 2*hy, xdim + 2*hx), dtype=self.data.dtype)
+        data[..., hy:hy+ydim, hx:hx+xdim] = self.data
         if zonal:
-            if len(self.data.shape) is 3:
-                self.data = np.concatenate((self.data[:, :, -halosize:], self.data,
-                                            self.data[:, :, 0:halosize]), axis=len(self.data.shape)-1)
-                assert self.data.shape[2] == self.grid.xdim
-            else:
-                self.data = np.concatenate((self.data[:, :, :, -halosize:], self.data,
-                                            self.data[:, :, :, 0:halosize]), axis=len(self.data.shape) - 1)
-                assert self.data.shape[3] == self.grid.xdim
-            self.lon = self.grid.lon
-            self.lat = self.grid.lat
+            data[..., hy:hy+ydim, :hx] = self.data[..., -hx:]
+            data[..., hy:hy+ydim, hx+xdim:] = self.data[..., :hx]
         if meridional:
-            if len(self.data.shape) is 3:
-                self.data = np.concatenate((self.data[:, -halosize:, :], self.data,
-                                            self.data[:, 0:halosize, :]), axis=len(self.data.shape)-2)
-                assert self.data.shape[1] == self.grid.ydim
-            else:
-                self.data = np.concatenate((self.data[:, :, -halosize:, :], self.data,
-                                            self.data[:, :, 0:halosize, :]), axis=len(self.data.shape) - 2)
-                assert self.data.shape[2] == self.grid.ydim
-            self.lat = self.grid.lat
+            data[..., :hy, :] = data[..., ydim:ydim+hy, :]
+            data[..., hy+ydim:, :] = data[..., hy:2*hy, :]
+        self.data = data
+        assert self.data.shape[-1] == self.grid.xdim
+        assert self.data.shape[-2] == self.grid.ydim
+        self.lon = self.grid.lon
+        self.lat = self.grid.lat
 
     def write(self, filename, varname=None):
         """Write a :class:`Field` to a netcdf file
@@ -919,22 +1123,24 @@ class Field(object):
         # Derive name of 'depth' variable for NEMO convention
         vname_depth = 'depth%s' % self.name.lower()
 
-        # Create DataArray objects for file I/O
+        # Write the variables directly with netCDF4, following NEMO conventions
         t, d, x, y = (self.grid.time.size, self.grid.depth.size,
                       self.grid.lon.size, self.grid.lat.size)
-        nav_lon = xarray.DataArray(self.grid.lon + np.zeros((y, x), dtype=np.float32),
-                                   coords=[('y', self.grid.lat), ('x', self.grid.lon)])
-        nav_lat = xarray.DataArray(self.grid.lat.reshape(y, 1) + np.zeros(x, dtype=np.float32),
-                                   coords=[('y', self.grid.lat), ('x', self.grid.lon)])
-        vardata = xarray.DataArray(self.data.reshape((t, d, y, x)),
-                                   coords=[('time_counter', self.grid.time),
-                                           (vname_depth, self.grid.depth),
-                                           ('y', self.grid.lat), ('x', self.grid.lon)])
-        # Create xarray Dataset and output to netCDF format
-        dset = xarray.Dataset({varname: vardata}, coords={'nav_lon': nav_lon,
-                                                          'nav_lat': nav_lat,
-                                                          vname_depth: self.grid.depth})
-        dset.to_netcdf(filepath)
+        dset = Dataset(filepath, 'w', format="NETCDF4")
+        try:
+            for dimname, size in [('time_counter', t), (vname_depth, d), ('y', y), ('x', x)]:
+                dset.createDimension(dimname, size)
+            dset.createVariable('time_counter', 'f8', ('time_counter',))[:] = self.grid.time
+            dset.createVariable(vname_depth, 'f4', (vname_depth,))[:] = self.grid.depth
+            dset.createVariable('y', 'f4', ('y',))[:] = self.grid.lat
+            dset.createVariable('x', 'f4', ('x',))[:] = self.grid.lon
+            dset.createVariable('nav_lon', 'f4', ('y', 'x'))[:] = np.broadcast_to(self.grid.lon, (y, x))
+            dset.createVariable('nav_lat', 'f4', ('y', 'x'))[:] = np.broadcast_to(self.grid.lat.reshape(y, 1), (y, x))
+            var = dset.createVariable(varname, 'f4', ('time_counter', vname_depth, 'y', 'x'))
+            var.coordinates = 'nav_lon nav_lat'
+            var[:] = self.data.reshape((t, d, y, x))
+        finally:
+            dset.close()
 
     def advancetime(self, field_new, advanceForward):
         if advanceForward == 1:  # forward in time, so appending at end
@@ -997,14 +1203,24 @@ class FileBuffer(object):
         else:
             return np.zeros(1)
 
+    @staticmethod
+    def as_slice(inds):
+        """Convert a list of consecutive indices to a slice, which netCDF4
+        reads as a single hyperslab instead of through fancy indexing"""
+        if len(inds) > 0 and np.array_equal(np.diff(inds), np.ones(len(inds)-1)):
+            return slice(inds[0], inds[-1]+1)
+        return inds
+
     @property
     def data(self):
+        indslat = self.as_slice(self.indslat)
+        indslon = self.as_slice(self.indslon)
         if len(self.dataset[self.name].shape) == 2:
-            data = self.dataset[self.name][self.indslat, self.indslon]
+            data = self.dataset[self.name][indslat, indslon]
         elif len(self.dataset[self.name].shape) == 3:
-            data = self.dataset[self.name][:, self.indslat, self.indslon]
+            data = self.dataset[self.name][self.as_slice(self.indstime), indslat, indslon]
         else:
-            data = self.dataset[self.name][:, self.indsdepth, self.indslat, self.indslon]
+            data = self.dataset[self.name][self.as_slice(self.indstime), self.as_slice(self.indsdepth), indslat, indslon]
 
         if np.ma.is_masked(data):  # convert masked array to ndarray
             data = np.ma.filled(data, np.nan)
@@ -1023,7 +1239,8 @@ class FileBuffer(object):
                 # parse it as a string.
                 # See http://unidata.github.io/netcdf4-python/#netCDF4.num2date
                 dt -= parse(str(offset))
-            return list(map(timedelta.total_seconds, dt))
+            # Convert the timedeltas to seconds in one go, through numpy's timedelta64
+            return np.array(dt, dtype='timedelta64[us]').astype(np.int64) / 1e6
         else:
             try:
                 return self.dataset[self.dimensions['time']][:]
@@ -6,7 +6,6 @@ from parcels.loggers import logger
 import numpy as np
 from os import path
 from glob import glob
-from copy import deepcopy
 
 
 __all__ = ['FieldSet']
@@ -21,6 +20,7 @@ class FieldSet(object):
     """
     def __init__(self, U, V, fields={}):
         self.gridset = GridSet()
+        self._fields = {}  # Registry of the Fields added to this FieldSet, by name
         if U:
             self.add_field(U)
         if V:
@@ -28,6 +28,7 @@ class FieldSet(object):
         UV = Field('UV', None)
         UV.fieldset = self
         self.UV = UV
+        self._fields['UV'] = UV
 
         # Add additional fields as attributes
         for name, field in fields.items():
@@ -86,6 +87,7 @@ class FieldSet(object):
         :param field: :class:`parcels.field.Field` object to be added
         """
         setattr(self, field.name, field)
+        self._fields[field.name] = field
         self.gridset.add_grid(field)
         field.fieldset = self
 
@@ -239,12 +241,10 @@ class FieldSet(object):
         """
 
         dimensions = {}
-        default_dims = {'lon': 'nav_lon', 'lat': 'nav_lat',
-                        'depth': 'depth', 'time': 'time_counter'}
         extra_fields.update({'U': uvar, 'V': vvar})
         for vars in extra_fields:
-            dimensions[vars] = deepcopy(default_dims)
-            dimensions[vars]['depth'] = 'depth%s' % vars.lower()
+            dimensions[vars] = {'lon': 'nav_lon', 'lat': 'nav_lat',
+                                'depth': 'depth%s' % vars.lower(), 'time': 'time_counter'}
         filenames = dict([(v, str("%s%s.nc" % (basename, v)))
                           for v in extra_fields.keys()])
         return cls.from_netcdf(filenames, indices=indices, variables=extra_fields,
@@ -255,7 +255,7 @@ class FieldSet(object):
     def fields(self):
         """Returns a list of all the :class:`parcels.field.Field` objects
         associated with this FieldSet"""
-        return [v for v in self.__dict__.values() if isinstance(v, Field)]
+        return list(self._fields.values())
 
     def add_constant(self, name, value):
         """Add a constant to the FieldSet. Note that all constants are
@@ -287,9 +287,8 @@ class FieldSet(object):
 
         for grid in self.gridset.grids:
             grid.add_periodic_halo(zonal, meridional, halosize)
-        for attr, value in self.__dict__.iteritems():
-            if isinstance(value, Field):
-                value.add_periodic_halo(zonal, meridional, halosize)
+        for field in self.fields:
+            field.add_periodic_halo(zonal, meridional, halosize)
 
     def eval(self, x, y):
         """Evaluate the zonal and meridional velocities (u,v) at a point (x,y)
@@ -313,7 +312,7 @@ class FieldSet(object):
         self.V.write(filename, varname='vomecrty')
 
         for v in self.fields:
-            if (v.name is not 'U') and (v.name is not 'V'):
+            if (v.name != 'U') and (v.name != 'V'):
                 v.write(filename)
 
     def advancetime(self, fieldset_new):
@@ -75,6 +75,7 @@ class RectilinearGrid(Grid):
         self.mesh = mesh
         self.cstruct = None
         self.cell_edge_sizes = {}
+        self.last_search = None  # Last index search, shared by all Fields on this Grid
 
     def add_periodic_halo(self, zonal, meridional, halosize=5):
         """Add a 'halo' to the Grid, through extending the Grid (and lon/lat)
@@ -96,7 +97,7 @@ class RectilinearGrid(Grid):
             self.ydim = self.lat.size
 
     def advancetime(self, grid_new):
-        if len(grid_new.time) is not 1:
+        if len(grid_new.time) != 1:
             raise RuntimeError('New FieldSet needs to have only one snapshot')
         if grid_new.time > self.time[-1]:  # forward in time, so appending at end
             self.time = np.concatenate((self.time[1:], grid_new.time))
@@ -226,6 +227,7 @@ class CurvilinearGrid(Grid):
         self.ydim = self.lon.shape[0]
         self.tdim = self.time.size
         self.cell_edge_sizes = {}
+        self.last_search = None  # Last index search, shared by all Fields on this Grid
 
     def add_periodic_halo(self, zonal, meridional, halosize=5):
         """Add a 'halo' to the Grid, through extending the Grid (and lon/lat)
@@ -257,7 +259,7 @@ class CurvilinearGrid(Grid):
             self.ydim = self.lat.shape[0]
 
     def advancetime(self, grid_new):
-        if len(grid_new.time) is not 1:
+        if len(grid_new.time) != 1:
             raise RuntimeError('New FieldSet needs to have only one snapshot')
         if grid_new.time > self.time[-1]:  # forward in time, so appending at end
             self.time = np.concatenate((self.time[1:], grid_new.time))
@@ -13,15 +13,21 @@ class GridSet(object):
     def __init__(self):
         self.grids = []
         self.size = 0
+        self._grid_index = {}  # Maps id(grid) to its position in self.grids
 
     def add_grid(self, field):
         grid = field.grid
         existing_grid = False
         for g in self.grids:
+            if g is grid:
+                return
             sameGrid = True
             for attr in ['lon', 'lat', 'depth', 'time']:
                 gattr = getattr(g, attr)
                 gridattr = getattr(grid, attr)
+                if gattr is gridattr:
+                    # Grids built from the same axis arrays need no comparison
+                    continue
                 if gattr.shape != gridattr.shape or not np.allclose(gattr, gridattr):
                     sameGrid = False
                     break
@@ -32,9 +38,14 @@ class GridSet(object):
             break
 
         if not existing_grid:
+            self._grid_index[id(grid)] = len(self.grids)
             self.grids.append(grid)
             self.size += 1
 
+    def grid_index(self, grid):
+        """Return the position of grid in the GridSet"""
+        return self._grid_index[id(grid)]
+
 
 class GridIndexSet(object):
     """GridIndexSet class that holds the GridIndices which store the particle position indices for the different grids
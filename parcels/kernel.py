@@ -1,9 +1,9 @@
 from parcels.codegenerator import KernelGenerator, LoopGenerator
 from parcels.compiler import get_cache_dir
 from parcels.kernels.error import ErrorCode, recovery_map as recovery_base_map
-from parcels.field import FieldSamplingError
+from parcels.field import FieldSamplingError, TimeExtrapolationError
 from parcels.loggers import logger
-from parcels.kernels.advection import AdvectionRK4_3D
+from parcels.kernels.advection import AdvectionRK4, AdvectionRK4_3D, AdvectionRK4_batch, AdvectionRK4_3D_batch
 from os import path, remove
 import numpy as np
 import numpy.ctypeslib as npct
@@ -25,6 +25,9 @@ __all__ = ['Kernel']
 
 re_indent = re.compile(r"^(\s+)")
 
+# Vectorised versions of kernels, used in SciPy mode when all particles are in sync
+batch_kernels = {AdvectionRK4: AdvectionRK4_batch, AdvectionRK4_3D: AdvectionRK4_3D_batch}
+
 
 def fix_indentation(string):
     """Fix indentation to allow in-lined kernel definitions"""
@@ -165,6 +168,11 @@ class Kernel(object):
         """Invokes JIT engine to perform the core update loop"""
         for g in pset.fieldset.gridset.grids:
             g.cstruct = None  # This force to point newly the grids from Python to C
+            # The C code reads the grid axes through raw pointers, so they
+            # also need a C-contiguous memory layout
+            for axis in ['lon', 'lat', 'depth', 'time']:
+                if not getattr(g, axis).flags.c_contiguous:
+                    setattr(g, axis, np.ascontiguousarray(getattr(g, axis)))
         # Make a copy of the transposed array to enforce
         # C-contiguous memory layout for JIT mode.
         for f in self.field_args.values():
@@ -176,9 +184,40 @@ class Kernel(object):
         self._function(c_int(len(pset)), particle_data,
                        c_double(endtime), c_float(dt), *fargs)
 
+    def execute_python_batch(self, pset, endtime, dt):
+        """Advances all particles at once with the vectorised version of the kernel
+        (see `batch_kernels`), as long as they share the same time and timestep.
+        Particles that are not in sync, or a step that samples a field out of
+        its spatial or time domain, are left to the per-particle loop in
+        :func:`execute_python`, which applies the recovery kernels"""
+        batch_kernel = batch_kernels[self.pyfunc]
+        particles = pset.particles
+        if len(particles) < 2:
+            return
+        ptime, pdt = particles[0].time, particles[0].dt
+        if any(p.time != ptime or p.dt != pdt for p in particles):
+            return
+        sign_dt = np.sign(dt)
+        if np.sign(endtime - ptime) != sign_dt:
+            return
+        dt_pos = min(abs(pdt), abs(endtime - ptime))
+        while dt_pos > 1e-6:
+            try:
+                batch_kernel(particles, pset.fieldset, ptime, sign_dt * dt_pos)
+            except (FieldSamplingError, TimeExtrapolationError) as e:
+                logger.debug("%s falls back to per-particle execution at time %s: %s"
+                             % (self.funcname, ptime, e))
+                return
+            ptime += sign_dt * dt_pos
+            for p in particles:
+                p.time = ptime
+            dt_pos = min(abs(pdt), abs(endtime - ptime))
+
     def execute_python(self, pset, endtime, dt):
         """Performs the core update loop via Python"""
         sign_dt = np.sign(dt)
+        if self.pyfunc in batch_kernels and dt != 0:
+            self.execute_python_batch(pset, endtime, dt)
         for p in pset.particles:
             # Don't execute particles that aren't started yet
             sign_end_part = np.sign(endtime - p.time)
@@ -1,50 +1,110 @@
 """Collection of pre-built advection kernels"""
 from parcels.kernels.error import ErrorCode
 import math
+import numpy as np
 
 
-__all__ = ['AdvectionRK4', 'AdvectionEE', 'AdvectionRK45', 'AdvectionRK4_3D']
+__all__ = ['AdvectionRK4', 'AdvectionEE', 'AdvectionRK45', 'AdvectionRK4_3D',
+           'AdvectionRK4_batch', 'AdvectionRK4_3D_batch']
 
 
 def AdvectionRK4(particle, fieldset, time, dt):
     """Advection of particles using fourth-order Runge-Kutta integration.
 
     Function needs to be converted to Kernel object before execution"""
-    (u1, v1) = fieldset.UV[time, particle.lon, particle.lat, particle.depth]
-    lon1, lat1 = (particle.lon + u1*.5*dt, particle.lat + v1*.5*dt)
-    (u2, v2) = fieldset.UV[time + .5 * dt, lon1, lat1, particle.depth]
-    lon2, lat2 = (particle.lon + u2*.5*dt, particle.lat + v2*.5*dt)
-    (u3, v3) = fieldset.UV[time + .5 * dt, lon2, lat2, particle.depth]
-    lon3, lat3 = (particle.lon + u3*dt, particle.lat + v3*dt)
-    (u4, v4) = fieldset.UV[time + dt, lon3, lat3, particle.depth]
-    particle.lon += (u1 + 2*u2 + 2*u3 + u4) / 6. * dt
-    particle.lat += (v1 + 2*v2 + 2*v3 + v4) / 6. * dt
+    # Read the particle position once, instead of at every stage
+    lon0, lat0, depth0 = (particle.lon, particle.lat, particle.depth)
+    (u1, v1) = fieldset.UV[time, lon0, lat0, depth0]
+    lon1, lat1 = (lon0 + u1*.5*dt, lat0 + v1*.5*dt)
+    (u2, v2) = fieldset.UV[time + .5 * dt, lon1, lat1, depth0]
+    lon2, lat2 = (lon0 + u2*.5*dt, lat0 + v2*.5*dt)
+    (u3, v3) = fieldset.UV[time + .5 * dt, lon2, lat2, depth0]
+    lon3, lat3 = (lon0 + u3*dt, lat0 + v3*dt)
+    (u4, v4) = fieldset.UV[time + dt, lon3, lat3, depth0]
+    particle.lon = lon0 + (u1 + 2*u2 + 2*u3 + u4) / 6. * dt
+    particle.lat = lat0 + (v1 + 2*v2 + 2*v3 + v4) / 6. * dt
+
+
+def AdvectionRK4_batch(particles, fieldset, time, dt):
+    """Vectorised version of :func:`AdvectionRK4` for a list of particles
+    that share the same time and timestep.
+
+    Each Runge-Kutta stage samples the velocities of all particles with a
+    single call to :func:`parcels.field.Field.getUV_batch`. The particles
+    are only updated once all four stages succeeded, so that a failing
+    sample leaves them untouched. This is used by
+    :func:`parcels.kernel.Kernel.execute_python` in SciPy mode; in JIT mode
+    the scalar :func:`AdvectionRK4` is compiled instead."""
+    lon = np.array([p.lon for p in particles], dtype=np.float64)
+    lat = np.array([p.lat for p in particles], dtype=np.float64)
+    depth = np.array([p.depth for p in particles], dtype=np.float64)
+    (u1, v1) = fieldset.UV.getUV_batch(time, lon, lat, depth)
+    (u2, v2) = fieldset.UV.getUV_batch(time + .5 * dt, lon + u1*.5*dt, lat + v1*.5*dt, depth)
+    (u3, v3) = fieldset.UV.getUV_batch(time + .5 * dt, lon + u2*.5*dt, lat + v2*.5*dt, depth)
+    (u4, v4) = fieldset.UV.getUV_batch(time + dt, lon + u3*dt, lat + v3*dt, depth)
+    lon += (u1 + 2*u2 + 2*u3 + u4) / 6. * dt
+    lat += (v1 + 2*v2 + 2*v3 + v4) / 6. * dt
+    for p, plon, plat in zip(particles, lon, lat):
+        p.lon = plon
+        p.lat = plat
 
 
 def AdvectionRK4_3D(particle, fieldset, time, dt):
     """Advection of particles using fourth-order Runge-Kutta integration including vertical velocity.
 
     Function needs to be converted to Kernel object before execution"""
-    (u1, v1) = fieldset.UV[time, particle.lon, particle.lat, particle.depth]
-    w1 = fieldset.W[time, particle.lon, particle.lat, particle.depth]
-    lon1 = particle.lon + u1*.5*dt
-    lat1 = particle.lat + v1*.5*dt
-    dep1 = particle.depth + w1*.5*dt
+    # Read the particle position once, instead of at every stage
+    lon0, lat0, depth0 = (particle.lon, particle.lat, particle.depth)
+    (u1, v1) = fieldset.UV[time, lon0, lat0, depth0]
+    w1 = fieldset.W[time, lon0, lat0, depth0]
+    lon1 = lon0 + u1*.5*dt
+    lat1 = lat0 + v1*.5*dt
+    dep1 = depth0 + w1*.5*dt
     (u2, v2) = fieldset.UV[time + .5 * dt, lon1, lat1, dep1]
     w2 = fieldset.W[time + .5 * dt, lon1, lat1, dep1]
-    lon2 = particle.lon + u2*.5*dt
-    lat2 = particle.lat + v2*.5*dt
-    dep2 = particle.depth + w2*.5*dt
+    lon2 = lon0 + u2*.5*dt
+    lat2 = lat0 + v2*.5*dt
+    dep2 = depth0 + w2*.5*dt
     (u3, v3) = fieldset.UV[time + .5 * dt, lon2, lat2, dep2]
     w3 = fieldset.W[time + .5 * dt, lon2, lat2, dep2]
-    lon3 = particle.lon + u3*dt
-    lat3 = particle.lat + v3*dt
-    dep3 = particle.depth + w3*dt
+    lon3 = lon0 + u3*dt
+    lat3 = lat0 + v3*dt
+    dep3 = depth0 + w3*dt
     (u4, v4) = fieldset.UV[time + dt, lon3, lat3, dep3]
     w4 = fieldset.W[time + dt, lon3, lat3, dep3]
-    particle.lon += (u1 + 2*u2 + 2*u3 + u4) / 6. * dt
-    particle.lat += (v1 + 2*v2 + 2*v3 + v4) / 6. * dt
-    particle.depth += (w1 + 2*w2 + 2*w3 + w4) / 6. * dt
+    particle.lon = lon0 + (u1 + 2*u2 + 2*u3 + u4) / 6. * dt
+    particle.lat = lat0 + (v1 + 2*v2 + 2*v3 + v4) / 6. * dt
+    particle.depth = depth0 + (w1 + 2*w2 + 2*w3 + w4) / 6. * dt
+
+
+def AdvectionRK4_3D_batch(particles, fieldset, time, dt):
+    """Vectorised version of :func:`AdvectionRK4_3D` for a list of particles
+    that share the same time and timestep.
+
+    As in :func:`AdvectionRK4_batch`, each stage samples U, V and W for all
+    particles at once and the particles are only updated at the end."""
+    lon = np.array([p.lon for p in particles], dtype=np.float64)
+    lat = np.array([p.lat for p in particles], dtype=np.float64)
+    depth = np.array([p.depth for p in particles], dtype=np.float64)
+    W = fieldset.W
+    (u1, v1) = fieldset.UV.getUV_batch(time, lon, lat, depth)
+    w1 = W.eval_batch(time, lon, lat, depth)
+    lon1, lat1, dep1 = (lon + u1*.5*dt, lat + v1*.5*dt, depth + w1*.5*dt)
+    (u2, v2) = fieldset.UV.getUV_batch(time + .5 * dt, lon1, lat1, dep1)
+    w2 = W.eval_batch(time + .5 * dt, lon1, lat1, dep1)
+    lon2, lat2, dep2 = (lon + u2*.5*dt, lat + v2*.5*dt, depth + w2*.5*dt)
+    (u3, v3) = fieldset.UV.getUV_batch(time + .5 * dt, lon2, lat2, dep2)
+    w3 = W.eval_batch(time + .5 * dt, lon2, lat2, dep2)
+    lon3, lat3, dep3 = (lon + u3*dt, lat + v3*dt, depth + w3*dt)
+    (u4, v4) = fieldset.UV.getUV_batch(time + dt, lon3, lat3, dep3)
+    w4 = W.eval_batch(time + dt, lon3, lat3, dep3)
+    lon += (u1 + 2*u2 + 2*u3 + u4) / 6. * dt
+    lat += (v1 + 2*v2 + 2*v3 + v4) / 6. * dt
+    depth += (w1 + 2*w2 + 2*w3 + w4) / 6. * dt
+    for p, plon, plat, pdepth in zip(particles, lon, lat, depth):
+        p.lon = plon
+        p.lat = plat
+        p.depth = pdepth
 
 
 def AdvectionEE(particle, fieldset, time, dt):
@@ -62,43 +122,41 @@ def AdvectionRK45(particle, fieldset, time, dt):
     Times-step dt is halved if error is larger than tolerance, and doubled
     if error is smaller than 1/10th of tolerance, with tolerance set to
     1e-9 * dt by default."""
-    tol = [1e-9]
-    c = [1./4., 3./8., 12./13., 1., 1./2.]
-    A = [[1./4., 0., 0., 0., 0.],
-         [3./32., 9./32., 0., 0., 0.],
-         [1932./2197., -7200./2197., 7296./2197., 0., 0.],
-         [439./216., -8., 3680./513., -845./4104., 0.],
-         [-8./27., 2., -3544./2565., 1859./4104., -11./40.]]
-    b4 = [25./216., 0., 1408./2565., 2197./4104., -1./5.]
-    b5 = [16./135., 0., 6656./12825., 28561./56430., -9./50., 2./55.]
-
-    (u1, v1) = fieldset.UV[time, particle.lon, particle.lat, particle.depth]
-    lon1, lat1 = (particle.lon + u1 * A[0][0] * dt,
-                  particle.lat + v1 * A[0][0] * dt)
-    (u2, v2) = fieldset.UV[time + c[0] * dt, lon1, lat1, particle.depth]
-    lon2, lat2 = (particle.lon + (u1 * A[1][0] + u2 * A[1][1]) * dt,
-                  particle.lat + (v1 * A[1][0] + v2 * A[1][1]) * dt)
-    (u3, v3) = fieldset.UV[time + c[1] * dt, lon2, lat2, particle.depth]
-    lon3, lat3 = (particle.lon + (u1 * A[2][0] + u2 * A[2][1] + u3 * A[2][2]) * dt,
-                  particle.lat + (v1 * A[2][0] + v2 * A[2][1] + v3 * A[2][2]) * dt)
-    (u4, v4) = fieldset.UV[time + c[2] * dt, lon3, lat3, particle.depth]
-    lon4, lat4 = (particle.lon + (u1 * A[3][0] + u2 * A[3][1] + u3 * A[3][2] + u4 * A[3][3]) * dt,
-                  particle.lat + (v1 * A[3][0] + v2 * A[3][1] + v3 * A[3][2] + v4 * A[3][3]) * dt)
-    (u5, v5) = fieldset.UV[time + c[3] * dt, lon4, lat4, particle.depth]
-    lon5, lat5 = (particle.lon + (u1 * A[4][0] + u2 * A[4][1] + u3 * A[4][2] + u4 * A[4][3] + u5 * A[4][4]) * dt,
-                  particle.lat + (v1 * A[4][0] + v2 * A[4][1] + v3 * A[4][2] + v4 * A[4][3] + v5 * A[4][4]) * dt)
-    (u6, v6) = fieldset.UV[time + c[4] * dt, lon5, lat5, particle.depth]
-
-    lon_4th = particle.lon + (u1 * b4[0] + u2 * b4[1] + u3 * b4[2] + u4 * b4[3] + u5 * b4[4]) * dt
-    lat_4th = particle.lat + (v1 * b4[0] + v2 * b4[1] + v3 * b4[2] + v4 * b4[3] + v5 * b4[4]) * dt
-    lon_5th = particle.lon + (u1 * b5[0] + u2 * b5[1] + u3 * b5[2] + u4 * b5[3] + u5 * b5[4] + u6 * b5[5]) * dt
-    lat_5th = particle.lat + (v1 * b5[0] + v2 * b5[1] + v3 * b5[2] + v4 * b5[3] + v5 * b5[4] + v6 * b5[5]) * dt
+    # The Runge-Kutta-Fehlberg coefficients are written out as literals
+    # (instead of lists c, A, b4 and b5) so that they are folded into
+    # constants at compile time, both in Python and in the generated C code.
+    # The zero coefficients of the tableau are left out. The tolerance is
+    # inlined too, as `tol` is reserved as a kernel variable name.
+    # The particle position is read once, instead of at every stage.
+    lon0, lat0, depth0 = (particle.lon, particle.lat, particle.depth)
+
+    (u1, v1) = fieldset.UV[time, lon0, lat0, depth0]
+    lon1, lat1 = (lon0 + u1 * (1./4.) * dt,
+                  lat0 + v1 * (1./4.) * dt)
+    (u2, v2) = fieldset.UV[time + (1./4.) * dt, lon1, lat1, depth0]
+    lon2, lat2 = (lon0 + (u1 * (3./32.) + u2 * (9./32.)) * dt,
+                  lat0 + (v1 * (3./32.) + v2 * (9./32.)) * dt)
+    (u3, v3) = fieldset.UV[time + (3./8.) * dt, lon2, lat2, depth0]
+    lon3, lat3 = (lon0 + (u1 * (1932./2197.) + u2 * (-7200./2197.) + u3 * (7296./2197.)) * dt,
+                  lat0 + (v1 * (1932./2197.) + v2 * (-7200./2197.) + v3 * (7296./2197.)) * dt)
+    (u4, v4) = fieldset.UV[time + (12./13.) * dt, lon3, lat3, depth0]
+    lon4, lat4 = (lon0 + (u1 * (439./216.) + u2 * (-8.) + u3 * (3680./513.) + u4 * (-845./4104.)) * dt,
+                  lat0 + (v1 * (439./216.) + v2 * (-8.) + v3 * (3680./513.) + v4 * (-845./4104.)) * dt)
+    (u5, v5) = fieldset.UV[time + dt, lon4, lat4, depth0]
+    lon5, lat5 = (lon0 + (u1 * (-8./27.) + u2 * 2. + u3 * (-3544./2565.) + u4 * (1859./4104.) + u5 * (-11./40.)) * dt,
+                  lat0 + (v1 * (-8./27.) + v2 * 2. + v3 * (-3544./2565.) + v4 * (1859./4104.) + v5 * (-11./40.)) * dt)
+    (u6, v6) = fieldset.UV[time + (1./2.) * dt, lon5, lat5, depth0]
+
+    lon_4th = lon0 + (u1 * (25./216.) + u3 * (1408./2565.) + u4 * (2197./4104.) + u5 * (-1./5.)) * dt
+    lat_4th = lat0 + (v1 * (25./216.) + v3 * (1408./2565.) + v4 * (2197./4104.) + v5 * (-1./5.)) * dt
+    lon_5th = lon0 + (u1 * (16./135.) + u3 * (6656./12825.) + u4 * (28561./56430.) + u5 * (-9./50.) + u6 * (2./55.)) * dt
+    lat_5th = lat0 + (v1 * (16./135.) + v3 * (6656./12825.) + v4 * (28561./56430.) + v5 * (-9./50.) + v6 * (2./55.)) * dt
 
     kappa = math.sqrt(math.pow(lon_5th - lon_4th, 2) + math.pow(lat_5th - lat_4th, 2))
-    if kappa <= math.fabs(dt * tol[0]):
+    if kappa <= math.fabs(dt * 1e-9):
         particle.lon = lon_4th
         particle.lat = lat_4th
-        if kappa <= math.fabs(dt * tol[0] / 10):
+        if kappa <= math.fabs(dt * 1e-9 / 10):
             particle.dt *= 2
     else:
         particle.dt /= 2
@@ -4,11 +4,25 @@ import netCDF4
 from datetime import timedelta as delta
 from parcels.loggers import logger
 from os import path
+import sys
+from threading import Thread
 
 
 __all__ = ['ParticleFile']
 
 
+def _contiguous_runs(inds):
+    """Private function to split a sorted array of row indices into runs of
+    consecutive rows
+
+    :param inds: Sorted 1D array of row indices
+    :returns: List of (start, stop) positions in `inds`, one per run
+    """
+    breaks = np.flatnonzero(np.diff(inds) != 1) + 1
+    bounds = np.concatenate(([0], breaks, [len(inds)]))
+    return zip(bounds[:-1], bounds[1:])
+
+
 class ParticleFile(object):
     """Initialise netCDF4.Dataset for trajectory output.
 
@@ -28,32 +42,73 @@ class ParticleFile(object):
                      while ParticleFile is given as an argument of ParticleSet.execute()
                      It is either a timedelta object or a positive double.
     :param write_ondelete: Boolean to write particle data only when they are deleted. Default is False
+    :param buffersize: Number of particle records kept in memory before they are written
+                       to file in one go. Default is 2**20
+    :param flush_on_sync: Boolean to write data to disk on every write that does not set `sync`,
+                          such as the writes at each outputdt of ParticleSet.execute(). If False,
+                          data is only written once `buffersize` particle records have been
+                          collected, or on sync() or close(). Default is True
+    :param chunksizes: Optional (trajectory, obs) chunk shape of the netCDF variables.
+                       Default is a shape of about 2**18 values per chunk, spanning the
+                       particles of the ParticleSet
+    :param zlib: Boolean to compress the netCDF variables. Default is False
+    :param complevel: Compression level (1-9) if zlib is True. Default is 1
+    :param quantize: Optional dict of the number of decimal digits to retain per written
+                     variable (e.g. {'lat': 5, 'lon': 5, 'z': 3}). Quantized variables are
+                     always compressed, and read back rounded to that precision
+    :param background_flush: Boolean to write buffered data to file in a separate thread,
+                             so that the simulation does not wait for it. Default is False
     """
 
-    def __init__(self, name, particleset, outputdt=np.infty, write_ondelete=False):
+    def __init__(self, name, particleset, outputdt=np.infty, write_ondelete=False, buffersize=2**20,
+                 flush_on_sync=True, chunksizes=None, zlib=False, complevel=1, quantize=None,
+                 background_flush=False):
 
         self.name = name
         self.write_ondelete = write_ondelete
         self.outputdt = outputdt
         self.lasttraj = 0  # id of last particle written
         self.lasttime_written = None  # variable to check if time has been written already
+        self.buffersize = buffersize
+        self.flush_on_sync = flush_on_sync
+        self._buffer = []  # (idx, fileids, time, values) of each write that is not on file yet
+        self._nbuffered = 0
+        self._max_block_ratio = 4  # max size of a dense flush block, relative to the buffered records
+        self.background_flush = background_flush
+        self._flush_thread = None
+        self._flush_error = None  # sys.exc_info() of a failed background flush
         extension = path.splitext(str(name))[1]
         fname = name if extension in ['.nc', '.nc4'] else "%s.nc" % name
         self.dataset = netCDF4.Dataset(fname, "w", format="NETCDF4")
+        # Output is written as plain (unscaled) arrays with NaN/default fill values,
+        # so skip netCDF4's masked-array and scaling checks on every put
+        self.dataset.set_auto_mask(False)
+        self.dataset.set_auto_scale(False)
         self.dataset.createDimension("obs", None)
         self.dataset.createDimension("trajectory", None)
         coords = ("trajectory", "obs")
+        if chunksizes is None:
+            tchunk = max(1, min(particleset.size, 2**18))
+            chunksizes = (tchunk, max(1, min(2**18 // tchunk, 1024)))
+        quantize = {} if quantize is None else quantize
+
+        def ncargs(name, once=False):
+            kwargs = {'chunksizes': chunksizes[:1] if once else chunksizes,
+                      'zlib': zlib, 'complevel': complevel, 'shuffle': zlib}
+            if name in quantize:
+                kwargs.update(least_significant_digit=quantize[name], zlib=True, shuffle=True)
+            return kwargs
         self.dataset.feature_type = "trajectory"
         self.dataset.Conventions = "CF-1.6/CF-1.7"
         self.dataset.ncei_template_version = "NCEI_NetCDF_Trajectory_Template_v2.0"
 
         # Create ID variable according to CF conventions
-        self.id = self.dataset.createVariable("trajectory", "i4", coords)
+        self.id = self.dataset.createVariable("trajectory", "i4", coords, **ncargs("trajectory"))
         self.id.long_name = "Unique identifier for each particle"
         self.id.cf_role = "trajectory_id"
 
         # Create time, lat, lon and z variables according to CF conventions:
-        self.time = self.dataset.createVariable("time", "f8", coords, fill_value=np.nan)
+        self.time = self.dataset.createVariable("time", "f8", coords, fill_value=np.nan, **ncargs("time"))
         self.time.long_name = ""
         self.time.standard_name = "time"
         if particleset.time_origin == 0:
@@ -63,19 +118,19 @@ class ParticleFile(object):
             self.time.calendar = "julian"
         self.time.axis = "T"
 
-        self.lat = self.dataset.createVariable("lat", "f4", coords, fill_value=np.nan)
+        self.lat = self.dataset.createVariable("lat", "f4", coords, fill_value=np.nan, **ncargs("lat"))
         self.lat.long_name = ""
         self.lat.standard_name = "latitude"
         self.lat.units = "degrees_north"
         self.lat.axis = "Y"
 
-        self.lon = self.dataset.createVariable("lon", "f4", coords, fill_value=np.nan)
+        self.lon = self.dataset.createVariable("lon", "f4", coords, fill_value=np.nan, **ncargs("lon"))
         self.lon.long_name = ""
         self.lon.standard_name = "longitude"
         self.lon.units = "degrees_east"
         self.lon.axis = "X"
 
-        self.z = self.dataset.createVariable("z", "f4", coords, fill_value=np.nan)
+        self.z = self.dataset.createVariable("z", "f4", coords, fill_value=np.nan, **ncargs("z"))
         self.z.long_name = ""
         self.z.standard_name = "depth"
         self.z.units = "m"
@@ -93,30 +148,140 @@ class ParticleFile(object):
                 continue
             if v.to_write:
                 if v.to_write is True:
-                    setattr(self, v.name, self.dataset.createVariable(v.name, "f4", coords, fill_value=np.nan))
+                    setattr(self, v.name, self.dataset.createVariable(v.name, "f4", coords,
+                                                                      fill_value=np.nan, **ncargs(v.name)))
                     self.user_vars += [v.name]
                 elif v.to_write == 'once':
-                    setattr(self, v.name, self.dataset.createVariable(v.name, "f4", "trajectory", fill_value=np.nan))
+                    setattr(self, v.name, self.dataset.createVariable(v.name, "f4", "trajectory",
+                                                                      fill_value=np.nan,
+                                                                      **ncargs(v.name, once=True)))
                     self.user_vars_once += [v.name]
                 getattr(self, v.name).long_name = ""
                 getattr(self, v.name).standard_name = v.name
                 getattr(self, v.name).units = "unknown"
 
+        # netCDF Variables and the particle Variables written into them, bound once
+        self._ncvars = [(self.lat, 'lat'), (self.lon, 'lon'), (self.z, 'depth')]
+        self._ncvars += [(getattr(self, var), var) for var in self.user_vars]
+        self._ncvars_once = [(getattr(self, var), var) for var in self.user_vars_once]
+
         self.idx = 0
 
     def __del__(self):
-        self.dataset.close()
+        try:
+            self.close()
+        except Exception:
+            pass  # the netCDF library may already be unloaded at interpreter exit
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Write all buffered data to disk and close the netCDF file"""
+        if self.dataset.isopen():
+            self.flush()
+            self._wait_for_flush()
+            self.dataset.close()
+
+    def flush(self):
+        """Write all buffered particle data to the netCDF variables
+
+        If the buffered observations fill most of the trajectory x observation
+        range they span, they are scattered into one dense block per variable,
+        so that each variable is written with a single contiguous put. Sparse
+        buffers, e.g. of particles written on deletion, are written record by
+        record instead, so that memory use stays proportional to the number of
+        buffered records. Each record is then split into runs of consecutive
+        trajectories, and each run is written as one slab. If the file was
+        created with `background_flush=True`, the puts are done in a separate
+        thread, while the simulation continues
+        """
+        self._wait_for_flush()
+        if len(self._buffer) == 0:
+            return
+        idx0 = self._buffer[0][0]
+        nobs = self._buffer[-1][0] + 1 - idx0
+        traj0 = min([inds.min() for _, inds, _, _ in self._buffer])
+        ntraj = max([inds.max() for _, inds, _, _ in self._buffer]) + 1 - traj0
+
+        puts = []
+        if ntraj * nobs <= self._max_block_ratio * self._nbuffered:
+            key = (slice(traj0, traj0+ntraj), slice(idx0, idx0+nobs))
+            block = np.full((ntraj, nobs), np.nan, dtype=np.float64)
+            for idx, inds, time, _ in self._buffer:
+                block[inds - traj0, idx - idx0] = time
+            puts.append((self.time, key, block))
+
+            block = np.full((ntraj, nobs), netCDF4.default_fillvals['i4'], dtype=np.int32)
+            for idx, inds, _, values in self._buffer:
+                block[inds - traj0, idx - idx0] = values['id']
+            puts.append((self.id, key, block))
+
+            for ncvar, name in self._ncvars:
+                block = np.full((ntraj, nobs), np.nan, dtype=np.float32)
+                for idx, inds, _, values in self._buffer:
+                    block[inds - traj0, idx - idx0] = values[name]
+                puts.append((ncvar, key, block))
+        else:
+            for idx, inds, time, values in self._buffer:
+                order = np.argsort(inds, kind='mergesort')
+                sinds = inds[order]
+                for start, stop in _contiguous_runs(sinds):
+                    key = (slice(sinds[start], sinds[stop-1]+1), idx)
+                    run = order[start:stop]
+                    puts.append((self.time, key, np.full(stop-start, time, dtype=np.float64)))
+                    puts.append((self.id, key, values['id'][run]))
+                    for ncvar, name in self._ncvars:
+                        puts.append((ncvar, key, values[name][run]))
+
+        self._buffer = []
+        self._nbuffered = 0
+
+        def put(puts):
+            try:
+                for ncvar, key, data in puts:
+                    ncvar[key] = data
+            except Exception:
+                # Re-raised by _wait_for_flush, as it would otherwise get lost with the thread
+                self._flush_error = sys.exc_info()
+
+        if self.background_flush:
+            self._flush_thread = Thread(target=put, args=(puts,))
+            self._flush_thread.start()
+        else:
+            for ncvar, key, data in puts:
+                ncvar[key] = data
+
+    def _wait_for_flush(self):
+        """Private method to wait until a background flush has finished, so that
+        the netCDF file is only ever accessed from one thread at a time. An
+        error raised by the background flush is raised again here"""
+        if self._flush_thread is not None:
+            self._flush_thread.join()
+            self._flush_thread = None
+        if self._flush_error is not None:
+            error, self._flush_error = self._flush_error, None
+            logger.error("Background flush of %s failed" % self.name, exc_info=error)
+            raise error[1]
 
     def sync(self):
         """Write all buffered data to disk"""
+        self.flush()
+        self._wait_for_flush()
         self.dataset.sync()
 
-    def write(self, pset, time, sync=True, deleted_only=False):
+    def write(self, pset, time, sync=None, deleted_only=False):
         """Write :class:`parcels.particleset.ParticleSet` data to file
 
         :param pset: ParticleSet object to write
         :param time: Time at which to write ParticleSet
-        :param sync: Optional argument whether to write data to disk immediately. Default is True
+        :param sync: Optional argument whether to write data to disk immediately.
+                     If False, the data is kept in memory until `buffersize` particle
+                     records have been collected, or until the next sync.
+                     Default is the `flush_on_sync` setting of the ParticleFile
 
         """
         if isinstance(time, delta):
@@ -131,24 +296,29 @@ class ParticleFile(object):
                     p.fileid = self.lasttraj
                     self.lasttraj += 1
 
-                inds = [p.fileid for p in pset]
-
-                self.id[inds, self.idx] = [p.id for p in pset]
-                self.time[inds, self.idx] = time
-                self.lat[inds, self.idx] = np.array([p.lat for p in pset])
-                self.lon[inds, self.idx] = np.array([p.lon for p in pset])
-                self.z[inds, self.idx] = np.array([p.depth for p in pset])
-                for var in self.user_vars:
-                    getattr(self, var)[inds, self.idx] = np.array([getattr(p, var) for p in pset])
-                for var in self.user_vars_once:
-                    if np.any(first_write):
-                        vals = [getattr(p, var) for p in first_write]
-                        newinds = [p.fileid for p in first_write]
-                        getattr(self, var)[newinds] = np.array(vals)
+                names = ['fileid', 'id', 'lat', 'lon', 'depth'] + self.user_vars
+                if hasattr(pset, '_as_soa'):
+                    soa = pset._as_soa(names)
+                else:  # array of particles, e.g. the deleted ones passed by Kernel.execute
+                    soa = dict((name, np.array([getattr(p, name) for p in pset])) for name in names)
+                # Copy, since the JIT arrays are views on the particle data
+                values = dict((name, np.array(soa[name])) for name in names)
+                self._buffer.append((self.idx, values['fileid'], time, values))
+                self._nbuffered += pset.size
+                if len(first_write) > 0 and len(self._ncvars_once) > 0:
+                    self._wait_for_flush()
+                    # New particles get consecutive fileids, so write them as one slice
+                    newinds = slice(first_write[0].fileid, self.lasttraj)
+                    for ncvar, var in self._ncvars_once:
+                        ncvar[newinds] = np.array([getattr(p, var) for p in first_write])
             else:
                 logger.warning("ParticleSet is empty on writing as array")
 
             self.idx += 1
 
+        if sync is None:
+            sync = self.flush_on_sync
         if sync:
             self.sync()
+        elif self._nbuffered >= self.buffersize:
+            self.flush()
@@ -1,13 +1,16 @@
 from parcels.kernel import Kernel
 from parcels.field import Field, UnitConverter
+from parcels.grid import GridCode
 from parcels.particle import JITParticle
 from parcels.compiler import GNUCompiler
 from parcels.kernels.advection import AdvectionRK4
 from parcels.particlefile import ParticleFile
 from parcels.loggers import logger
 import numpy as np
-import bisect
-from collections import Iterable
+try:
+    from collections.abc import Iterable
+except ImportError:  # Python 2
+    from collections import Iterable
 from datetime import timedelta as delta
 from datetime import datetime
 
@@ -47,10 +50,26 @@ class ParticleSet(object):
         depth = convert_to_list(depth)
         assert len(lon) == len(lat) and len(lon) == len(depth)
 
-        time = time.tolist() if isinstance(time, np.ndarray) else time
-        time = [time] * len(lat) if not isinstance(time, list) else time
-        time = [t.total_seconds() if isinstance(t, delta) else t for t in time]
-        time = [(t - fieldset.U.grid.time_origin).total_seconds() if isinstance(t, datetime) else t for t in time]
+        def convert_time(t):
+            # Convert timedelta and datetime objects to seconds (since time_origin)
+            if isinstance(t, delta):
+                return t.total_seconds()
+            elif isinstance(t, datetime):
+                return (t - fieldset.U.grid.time_origin).total_seconds()
+            return t
+
+        if isinstance(time, list) and len(time) > 0 and all(isinstance(t, datetime) for t in time):
+            time = np.array(time, dtype='datetime64[us]')
+        if isinstance(time, np.ndarray):
+            if time.dtype.kind == 'M':  # datetime64, converted in one vectorized step
+                time = (time - np.datetime64(fieldset.U.grid.time_origin)) / np.timedelta64(1, 's')
+            elif time.dtype.kind == 'm':  # timedelta64
+                time = time / np.timedelta64(1, 's')
+            time = time.flatten().tolist()
+        if isinstance(time, list):
+            time = [convert_time(t) for t in time]
+        else:
+            time = [convert_time(time)] * len(lat)
 
         assert len(lon) == len(time)
 
@@ -73,8 +92,10 @@ class ParticleSet(object):
         self.time_origin = fieldset.U.grid.time_origin
 
         if self.ptype.uses_jit:
-            # Allocate underlying data for C-allocated particles
-            self._particle_data = np.empty(size, dtype=self.ptype.dtype)
+            # Allocate underlying data for C-allocated particles. _particle_data is a view on
+            # the first `size` records of _particle_buffer, which can hold more (see `add`)
+            self._particle_buffer = np.empty(size, dtype=self.ptype.dtype)
+            self._particle_data = self._particle_buffer[:size]
 
             def cptr(i):
                 return self._particle_data[i]
@@ -144,20 +165,20 @@ class ParticleSet(object):
         latwidth = (start_field.grid.lat[1] - start_field.grid.lat[0]) / 2
 
         def add_jitter(pos, width, min, max):
-            value = pos + np.random.uniform(-width, width)
-            while not (min <= value <= max):
-                value = pos + np.random.uniform(-width, width)
+            # Rejection sampling, redrawing only the values that fell outside [min, max]
+            value = pos + np.random.uniform(-width, width, size=pos.size)
+            outside = (value < min) | (value > max)
+            while np.any(outside):
+                value[outside] = pos[outside] + np.random.uniform(-width, width, size=np.count_nonzero(outside))
+                outside = (value < min) | (value > max)
             return value
 
         if mode == 'monte_carlo':
-            p = np.reshape(start_field.data, (1, start_field.data.size))
-            inds = np.random.choice(start_field.data.size, size, replace=True, p=p[0] / np.sum(p))
+            p = start_field.data.ravel()
+            inds = np.random.choice(p.size, size, replace=True, p=p / np.sum(p))
             lat, lon = np.unravel_index(inds, start_field.data[0, :, :].shape)
-            lon = fieldset.U.grid.lon[lon]
-            lat = fieldset.U.grid.lat[lat]
-            for i in range(lon.size):
-                lon[i] = add_jitter(lon[i], lonwidth, start_field.grid.lon[0], start_field.grid.lon[-1])
-                lat[i] = add_jitter(lat[i], latwidth, start_field.grid.lat[0], start_field.grid.lat[-1])
+            lon = add_jitter(fieldset.U.grid.lon[lon], lonwidth, start_field.grid.lon[0], start_field.grid.lon[-1])
+            lat = add_jitter(fieldset.U.grid.lat[lat], latwidth, start_field.grid.lat[0], start_field.grid.lat[-1])
         else:
             raise NotImplementedError('Mode %s not implemented. Please use "monte carlo" algorithm instead.' % mode)
 
@@ -189,14 +210,52 @@ class ParticleSet(object):
             particles = particles.particles
         if not isinstance(particles, Iterable):
             particles = [particles]
-        self.particles = np.append(self.particles, particles)
         if self.ptype.uses_jit:
-            particles_data = [p._cptr for p in particles]
-            self._particle_data = np.append(self._particle_data, particles_data)
-            # Update C-pointer on particles
+            nold = len(self._particle_data)
+            nnew = nold + len(particles)
+            self._reserve(nnew)
+            self._particle_buffer[nold:nnew] = [p._cptr for p in particles]
+            self._particle_data = self._particle_buffer[:nnew]
+            # Update C-pointer on the added particles
+            for p, pdata in zip(particles, self._particle_data[nold:]):
+                p._cptr = pdata
+        self.particles = np.append(self.particles, particles)
+
+    def _reserve(self, size):
+        """Private method to make sure the JIT particle buffer can hold `size` particles.
+        The buffer grows geometrically, so that repeated adding is amortized O(1)"""
+        if size > len(self._particle_buffer):
+            nold = len(self._particle_data)
+            buffer = np.empty(max(2 * len(self._particle_buffer), size), dtype=self.ptype.dtype)
+            buffer[:nold] = self._particle_data
+            self._particle_buffer = buffer
+            self._particle_data = buffer[:nold]
+            # Update C-pointer on particles, since all their data has moved
             for p, pdata in zip(self.particles, self._particle_data):
                 p._cptr = pdata
 
+    def _repeat_release(self, time):
+        """Private method to release the particles of `repeatdt` at `time`. In JIT mode
+        they are constructed directly in the (spare capacity of the) particle buffer"""
+        nold = self.size
+        nrelease = len(self.repeatlon)
+        if self.ptype.uses_jit:
+            self._reserve(nold + nrelease)
+
+            def cptr(i):
+                return self._particle_buffer[nold + i]
+        else:
+            def cptr(i):
+                return None
+
+        particles = np.empty(nrelease, dtype=self.repeatpclass)
+        for i in range(nrelease):
+            particles[i] = self.repeatpclass(self.repeatlon[i], self.repeatlat[i], fieldset=self.fieldset,
+                                             depth=self.repeatdepth[i], cptr=cptr(i), time=time)
+        if self.ptype.uses_jit:
+            self._particle_data = self._particle_buffer[:nold + nrelease]
+        self.particles = np.append(self.particles, particles)
+
     def remove(self, indices):
         """Method to remove particles from the ParticleSet, based on their `indices`"""
         if isinstance(indices, Iterable):
@@ -205,12 +264,40 @@ class ParticleSet(object):
             particles = self.particles[indices]
         self.particles = np.delete(self.particles, indices)
         if self.ptype.uses_jit:
-            self._particle_data = np.delete(self._particle_data, indices)
-            # Update C-pointer on particles
-            for p, pdata in zip(self.particles, self._particle_data):
-                p._cptr = pdata
+            removed = np.atleast_1d(np.arange(len(self._particle_data))[indices])
+            if removed.size > 0:
+                # Give the removed particles their own copy of their data
+                for p, pdata in zip(np.atleast_1d(particles), self._particle_data[removed]):
+                    p._cptr = pdata
+                removed = np.unique(removed)
+                # Compact the remaining data in place; the particles before the
+                # first removed one keep both their place and their C-pointer
+                first = removed[0]
+                tail = np.delete(self._particle_data[first:], removed - first)
+                nnew = first + len(tail)
+                self._particle_buffer[first:nnew] = tail
+                self._particle_data = self._particle_buffer[:nnew]
+                # Update C-pointer on the particles that have moved
+                for p, pdata in zip(self.particles[first:], self._particle_data[first:]):
+                    p._cptr = pdata
         return particles
 
+    def _as_soa(self, names):
+        """Private method to gather particle Variables as one array per Variable
+
+        In JIT mode the arrays are views on the underlying particle data;
+        in SciPy mode the particles are traversed only once for all `names`.
+
+        :param names: List of names of the Variables to gather
+        """
+        if self.ptype.uses_jit:
+            return dict((name, self._particle_data[name]) for name in names)
+        dtypes = dict((v.name, v.dtype) for v in self.ptype.variables)
+        if self.size == 0:
+            return dict((name, np.empty(0, dtype=dtypes[name])) for name in names)
+        columns = zip(*[[getattr(p, name) for name in names] for p in self.particles])
+        return dict((name, np.array(col, dtype=dtypes[name])) for name, col in zip(names, columns))
+
     def execute(self, pyfunc=AdvectionRK4, endtime=None, runtime=None, dt=1.,
                 moviedt=None, recovery=None, output_file=None, movie_background_field=None):
         """Execute a given kernel function over the particle set for
@@ -219,7 +306,11 @@ class ParticleSet(object):
 
         :param pyfunc: Kernel function to execute. This can be the name of a
                        defined Python function or a :class:`parcels.kernel.Kernel` object.
-                       Kernels can be concatenated using the + operator
+                       Kernels can be concatenated using the + operator.
+                       In SciPy mode, plain AdvectionRK4 and AdvectionRK4_3D kernels are
+                       replaced by their vectorised versions (see `parcels.kernel.batch_kernels`),
+                       which advance all particles at once while they share the same time and dt.
+                       Concatenated kernels are always executed particle by particle
         :param endtime: End time for the timestepping loop.
                         It is either a datetime object or a positive double.
         :param runtime: Length of the timestepping loop. Use instead of endtime.
@@ -272,21 +363,27 @@ class ParticleSet(object):
         assert outputdt is None or outputdt >= 0, 'outputdt must be positive'
         assert moviedt is None or moviedt >= 0, 'moviedt must be positive'
 
+        grid_time = self.fieldset.U.grid.time
+
         # Set particle.time defaults based on sign of dt, if not set at ParticleSet construction
-        for p in self:
-            if np.isnan(p.time):
-                p.time = self.fieldset.U.grid.time[0] if dt >= 0 else self.fieldset.U.grid.time[-1]
+        ptimes = self._as_soa(['time'])['time']  # a view on the particle data in JIT mode
+        notset = np.isnan(ptimes)
+        if np.any(notset):
+            ptimes[notset] = grid_time[0] if dt >= 0 else grid_time[-1]
+            if not self.ptype.uses_jit:
+                for i in np.where(notset)[0]:
+                    self.particles[i].time = ptimes[i]
 
         # Derive _starttime and endtime from arguments or fieldset defaults
         if runtime is not None and endtime is not None:
             raise RuntimeError('Only one of (endtime, runtime) can be specified')
-        _starttime = min([p.time for p in self]) if dt >= 0 else max([p.time for p in self])
+        _starttime = np.min(ptimes) if dt >= 0 else np.max(ptimes)
         if self.repeatdt is not None and self.repeat_starttime is None:
             self.repeat_starttime = _starttime
         if runtime is not None:
             endtime = _starttime + runtime * np.sign(dt)
         elif endtime is None:
-            endtime = self.fieldset.U.grid.time[-1] if dt >= 0 else self.fieldset.U.grid.time[0]
+            endtime = grid_time[-1] if dt >= 0 else grid_time[0]
 
         if abs(endtime-_starttime) < 1e-5 or dt == 0 or runtime == 0:
             dt = 0
@@ -296,8 +393,11 @@ class ParticleSet(object):
                                 "The kernels will be executed once, without incrementing time")
 
         # Initialise particle timestepping
-        for p in self:
-            p.dt = dt
+        if self.ptype.uses_jit:
+            self._particle_data['dt'] = dt
+        else:
+            for p in self:
+                p.dt = dt
 
         # First write output_file, because particles could have been added
         if output_file:
@@ -308,13 +408,20 @@ class ParticleSet(object):
         if moviedt is None:
             moviedt = np.infty
         time = _starttime
+        # Python float (rather than numpy scalar) sign, so that the time
+        # bookkeeping in the loop below stays in plain Python floats
+        sign_dt = float(np.sign(dt))
+        # Signed intervals between releases, outputs and movie frames
+        repeatdt_step = self.repeatdt * sign_dt if self.repeatdt else None
+        outputdt_step = outputdt * sign_dt
+        moviedt_step = moviedt * sign_dt
         if self.repeatdt:
-            next_prelease = self.repeat_starttime + (abs(time - self.repeat_starttime) // self.repeatdt + 1) * self.repeatdt * np.sign(dt)
+            next_prelease = self.repeat_starttime + (abs(time - self.repeat_starttime) // self.repeatdt + 1) * repeatdt_step
         else:
-            next_prelease = np.infty * np.sign(dt)
-        next_output = time + outputdt * np.sign(dt)
-        next_movie = time + moviedt * np.sign(dt)
-        next_input = np.infty * np.sign(dt)  # Not used yet
+            next_prelease = np.infty * sign_dt
+        next_output = time + outputdt_step
+        next_movie = time + moviedt_step
+        next_input = np.infty * sign_dt  # Not used yet
 
         tol = 1e-12
         while (time < endtime and dt > 0) or (time > endtime and dt < 0) or dt == 0:
@@ -324,24 +431,22 @@ class ParticleSet(object):
                 time = max(next_prelease, next_input, next_output, next_movie, endtime)
             self.kernel.execute(self, endtime=time, dt=dt, recovery=recovery, output_file=output_file)
             if abs(time-next_prelease) < tol:
-                self.add(ParticleSet(fieldset=self.fieldset, time=time, lon=self.repeatlon,
-                                     lat=self.repeatlat, depth=self.repeatdepth,
-                                     pclass=self.repeatpclass))
-                next_prelease += self.repeatdt * np.sign(dt)
+                self._repeat_release(time)
+                next_prelease += repeatdt_step
             if abs(time-next_input) < tol:
                 continue
             if abs(time-next_output) < tol:
                 if output_file:
                     output_file.write(self, time)
-                next_output += outputdt * np.sign(dt)
+                next_output += outputdt_step
             if abs(time-next_movie) < tol:
                 self.show(field=movie_background_field, show_time=time)
-                next_movie += moviedt * np.sign(dt)
+                next_movie += moviedt_step
             if dt == 0:
                 break
 
         if output_file:
-            output_file.write(self, time)
+            output_file.write(self, time, sync=True)
 
     def show(self, particles=True, show_time=None, field=None, domain=None,
              land=False, vmin=None, vmax=None, savefile=None):
@@ -366,8 +471,9 @@ class ParticleSet(object):
         except:
             Basemap = None
 
-        plon = np.array([p.lon for p in self])
-        plat = np.array([p.lat for p in self])
+        pos = self._as_soa(['lon', 'lat'])
+        plon = np.array(pos['lon'])  # copies, so that the plot does not change with the particles
+        plat = np.array(pos['lat'])
         show_time = self[0].time if show_time is None else show_time
         if isinstance(show_time, datetime):
             show_time = (show_time - self.fieldset.U.grid.time_origin).total_seconds()
@@ -376,23 +482,17 @@ class ParticleSet(object):
         if np.isnan(show_time):
             show_time = self.fieldset.U.grid.time[0]
         if domain is not None:
-            def nearest_index(array, value):
-                """returns index of the nearest value in array using O(log n) bisection method"""
-                y = bisect.bisect(array, value)
-                if y == len(array):
-                    return y - 1
-                elif (abs(array[y - 1] - value) < abs(array[y] - value)):
-                    return y - 1
-                else:
-                    return y
-
-            latN = nearest_index(self.fieldset.U.lat, domain[0])
-            latS = nearest_index(self.fieldset.U.lat, domain[1])
-            lonE = nearest_index(self.fieldset.U.lon, domain[2])
-            lonW = nearest_index(self.fieldset.U.lon, domain[3])
+            def nearest_indices(array, values):
+                """returns indices of the nearest values in (sorted) array using one binary search"""
+                idx = np.clip(np.searchsorted(array, values), 1, len(array) - 1)
+                nearer_left = np.abs(values - array[idx - 1]) < np.abs(values - array[idx])
+                return np.where(nearer_left, idx - 1, idx)
+
+            latN, latS = nearest_indices(self.fieldset.U.lat, np.asarray(domain[:2]))
+            lonE, lonW = nearest_indices(self.fieldset.U.lon, np.asarray(domain[2:]))
         else:
             latN, latS, lonE, lonW = (-1, 0, -1, 0)
-        if field is not 'vector':
+        if field != 'vector':
             plt.ion()
             plt.clf()
             if particles:
@@ -448,8 +548,8 @@ class ParticleSet(object):
             m.drawmeridians(meridians, labels=[0, 0, 0, 1])
 
             # formating velocity data for quiver plotting
-            U = np.array([U[y, x] for x in range(len(lon)) for y in range(len(lat))])
-            V = np.array([V[y, x] for x in range(len(lon)) for y in range(len(lat))])
+            U = U.T.ravel()
+            V = V.T.ravel()
             speed = np.sqrt(U**2 + V**2)
             normU = U/speed
             normV = V/speed
@@ -464,7 +564,7 @@ class ParticleSet(object):
                 xs, ys = m(plon, plat)
                 m.scatter(xs, ys, color='black')
 
-        if time_origin is 0:
+        if time_origin == 0:
             timestr = ' after ' + str(delta(seconds=show_time)) + ' hours'
         else:
             timestr = ' on ' + str(time_origin + delta(seconds=show_time))
@@ -472,12 +572,12 @@ class ParticleSet(object):
         if particles:
             if field:
                 plt.title('Particles' + timestr)
-            elif field is 'vector':
+            elif field == 'vector':
                 plt.title('Particles and velocity field' + timestr)
             else:
                 plt.title('Particles and '+namestr + timestr)
         else:
-            if field is 'vector':
+            if field == 'vector':
                 plt.title('Velocity field' + timestr)
             else:
                 plt.title(namestr + timestr)
@@ -496,7 +596,8 @@ class ParticleSet(object):
 
         :param field: Optional :mod:`parcels.field.Field` object to calculate the histogram
                       on. Default is `fieldset.U`
-        :param particle_val: Optional numpy-array of values to weigh each particle with.
+        :param particle_val: Optional numpy-array of values to weigh each particle with,
+                             or the name of the particle Variable to use as weights.
                              Default is 1 for each particle
         :param relative: Boolean to control whether the density is scaled by the total
                          weight of all particles. Default is False
@@ -505,9 +606,29 @@ class ParticleSet(object):
         """
 
         field = field if field else self.fieldset.U
-        particle_val = particle_val if particle_val else np.ones(len(self.particles))
+        if particle_val is None:
+            particle_val = np.ones(len(self.particles))
+        elif isinstance(particle_val, str):
+            particle_val = self._as_soa([particle_val])[particle_val].astype(np.float64)
+        else:
+            particle_val = np.asarray(particle_val)
         density = np.zeros((field.grid.lat.size, field.grid.lon.size), dtype=np.float32)
 
+        grid = field.grid
+        if grid.gtype in [GridCode.RectilinearZGrid, GridCode.RectilinearSGrid] and np.all(np.diff(grid.lon) > 0):
+            # Locate all particles at once, with the same cell convention as Field.search_indices
+            pos = self._as_soa(['lon', 'lat'])
+            lon = pos['lon'].astype(np.float64)
+            lat = pos['lat'].astype(np.float64)
+            if grid.mesh == 'spherical':
+                lon = np.where(lon < grid.lon[0], lon + 360, lon)
+            if np.all((lon >= grid.lon[0]) & (lon <= grid.lon[-1]) & (lat >= grid.lat[0]) & (lat <= grid.lat[-1])):
+                xi = field.search_index_sorted(grid.lon, lon)
+                yi = field.search_index_sorted(grid.lat, lat)
+                np.add.at(density, (yi, xi), particle_val)
+                return self._scale_density(density, field, particle_val, relative, area_scale)
+
+        # Curvilinear grids, or particles out of the domain (raising the sampling error)
         for pi, p in enumerate(self.particles):
             try:  # breaks if either p.gridIndexSet does not exist (in scipy) or field not in fieldset
                 if p.gridIndexSet[field.grid].ti < 0:  # xi, yi, ti, not initialised
@@ -518,6 +639,10 @@ class ParticleSet(object):
                 _, _, _, xi, yi, _ = field.search_indices(p.lon, p.lat, p.depth, 0, 0, search2D=True)
             density[yi, xi] += particle_val[pi]
 
+        return self._scale_density(density, field, particle_val, relative, area_scale)
+
+    @staticmethod
+    def _scale_density(density, field, particle_val, relative, area_scale):
         if relative:
             density /= np.sum(particle_val)
 
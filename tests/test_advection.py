@@ -1,5 +1,5 @@
 from parcels import FieldSet, ParticleSet, ScipyParticle, JITParticle
-from parcels import AdvectionEE, AdvectionRK4, AdvectionRK45, AdvectionRK4_3D
+from parcels import AdvectionEE, AdvectionRK4, AdvectionRK45, AdvectionRK4_3D, AdvectionRK4_batch
 import numpy as np
 import pytest
 import math
@@ -193,7 +193,8 @@ def test_stationary_eddy(fieldset_stationary, mode, method, rtol, npart=1):
 
 
 @pytest.mark.parametrize('mode', ['scipy', 'jit'])
-def test_stationary_eddy_vertical(mode, npart=1):
+@pytest.mark.parametrize('npart', [1, 5])
+def test_stationary_eddy_vertical(mode, npart):
     lon = np.linspace(12000, 21000, npart, dtype=np.float32)
     lat = np.linspace(10000, 20000, npart, dtype=np.float32)
     depth = np.linspace(12500, 12500, npart, dtype=np.float32)
@@ -273,6 +274,30 @@ def test_moving_eddy(fieldset_moving, mode, method, rtol, npart=1):
     assert np.allclose(np.array([p.lat for p in pset]), exp_lat, rtol=rtol)
 
 
+def test_moving_eddy_batch(fieldset_moving, npart=5):
+    """Vectorised RK4 step in SciPy mode gives the same positions as the scalar kernel"""
+    fieldset = fieldset_moving
+    lon = np.linspace(12000, 21000, npart, dtype=np.float32)
+    lat = np.linspace(12500, 12500, npart, dtype=np.float32)
+    pset = ParticleSet(fieldset, pclass=ScipyParticle, lon=lon, lat=lat)
+    pset_batch = ParticleSet(fieldset, pclass=ScipyParticle, lon=lon, lat=lat)
+    dt = delta(minutes=3).total_seconds()
+    for time in np.arange(0., 3600., dt):
+        for p in pset:
+            AdvectionRK4(p, fieldset, time, dt)
+        AdvectionRK4_batch(pset_batch.particles, fieldset, time, dt)
+    assert np.allclose([p.lon for p in pset], [p.lon for p in pset_batch], rtol=1e-12)
+    assert np.allclose([p.lat for p in pset], [p.lat for p in pset_batch], rtol=1e-12)
+
+    pset = ParticleSet(fieldset, pclass=ScipyParticle, lon=lon, lat=lat)
+    endtime = delta(hours=6).total_seconds()
+    pset.execute(AdvectionRK4, dt=dt, endtime=endtime)
+    exp_lon = [truth_moving(x, y, endtime)[0] for x, y, in zip(lon, lat)]
+    exp_lat = [truth_moving(x, y, endtime)[1] for x, y, in zip(lon, lat)]
+    assert np.allclose(np.array([p.lon for p in pset]), exp_lon, rtol=1e-5)
+    assert np.allclose(np.array([p.lat for p in pset]), exp_lat, rtol=1e-5)
+
+
 def truth_decaying(x_0, y_0, t):
     lat = y_0 - ((u_0 - u_g) * f / (f ** 2 + gamma ** 2) *
                  (1 - np.exp(-gamma * t) * (np.cos(f * t) + gamma / f * np.sin(f * t))))
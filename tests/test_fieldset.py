@@ -61,6 +61,17 @@ def test_fieldset_from_data_different_dimensions(xdim, ydim, zdim=4, tdim=2):
     assert np.allclose(fieldset.P.data, 2., rtol=1e-12)
 
 
+def test_field_vmin_vmax_nan():
+    """ Test that data outside [vmin, vmax] and NaN values are set to zero. """
+    data, dimensions = generate_fieldset(10, 20)
+    data['U'][0, 0] = np.nan
+    U = data['U'].copy()
+    expected = np.where(np.isnan(U) | (U < 1.) | (U > 9.), 0., U)
+    fieldset = FieldSet.from_data(data, dimensions, vmin=1., vmax=9.)
+    assert np.allclose(fieldset.U.data[0, :], expected, rtol=1e-12)
+    assert not np.isnan(fieldset.U.data).any()
+
+
 @pytest.mark.parametrize('xdim', [100, 200])
 @pytest.mark.parametrize('ydim', [100, 200])
 def test_fieldset_from_parcels(xdim, ydim, tmpdir, filename='test_parcels'):
@@ -105,6 +116,22 @@ def test_moving_eddies_file_subsettime(indstime):
     assert np.allclose(fieldsetsub.P.data, fieldsetfull.P.data[indstime, :, :])
 
 
+def test_moving_eddies_file_advancetime():
+    fieldsetfile = path.join(path.dirname(__file__), 'test_data', 'testfields')
+    fieldsetfull = FieldSet.from_parcels(fieldsetfile, extra_fields={'P': 'P'})
+    fieldsetsub = FieldSet.from_parcels(fieldsetfile, extra_fields={'P': 'P'}, indices={'time': range(3)})
+    data_init = fieldsetsub.P.data
+    for ti in [3, 4, 5]:
+        fieldsetsub.advancetime(FieldSet.from_parcels(fieldsetfile, extra_fields={'P': 'P'}, indices={'time': [ti]}))
+        assert np.allclose(fieldsetsub.P.time, fieldsetfull.P.time[ti-2:ti+1])
+        assert np.allclose(fieldsetsub.P.data, fieldsetfull.P.data[ti-2:ti+1, :, :])
+    for ti in [2, 1]:
+        fieldsetsub.advancetime(FieldSet.from_parcels(fieldsetfile, extra_fields={'P': 'P'}, indices={'time': [ti]}))
+        assert np.allclose(fieldsetsub.U.time, fieldsetfull.U.time[ti:ti+3])
+        assert np.allclose(fieldsetsub.U.data, fieldsetfull.U.data[ti:ti+3, :, :])
+    assert np.allclose(data_init, fieldsetfull.P.data[0:3, :, :])
+
+
 @pytest.mark.parametrize('xdim', [100, 200])
 @pytest.mark.parametrize('ydim', [100, 200])
 def test_add_field(xdim, ydim, tmpdir, filename='test_add'):
@@ -99,6 +99,36 @@ def test_fieldset_sample_eval(fieldset, xdim=60, ydim=60):
     assert np.allclose(u_s, lat, rtol=1e-7)
 
 
+@pytest.mark.parametrize('interp_method', ['linear', 'nearest'])
+def test_fieldset_sample_eval_batch(fieldset_geometric_polar, interp_method, npart=100):
+    """ Sample the fieldset at many positions at once and compare with eval. """
+    lon = np.linspace(-170, 170, npart, dtype=np.float32)
+    lat = np.linspace(-80, 80, npart, dtype=np.float32)
+    for f in [fieldset_geometric_polar.U, fieldset_geometric_polar.V]:
+        f.interp_method = interp_method
+        vals = f.eval_batch(0, lon, lat, np.zeros(npart))
+        assert np.allclose(vals, [f.eval(0, x, y, 0.) for x, y in zip(lon, lat)], rtol=1e-6)
+
+
+@pytest.mark.parametrize('interp_method', ['linear', 'nearest'])
+def test_fieldset_sample_eval_batch_decreasing_lat(interp_method, xdim=20, ydim=10, npart=50):
+    """ eval_batch falls back on eval for a north-to-south latitude axis,
+    instead of building fractional indices on the decreasing axis """
+    lon = np.linspace(0, 10, xdim, dtype=np.float32)
+    lat = np.linspace(10, 0, ydim, dtype=np.float32)
+    U, V = np.meshgrid(lon, lat)
+    fieldset = FieldSet.from_data({'U': U.astype(np.float32), 'V': V.astype(np.float32)},
+                                  {'lon': lon, 'lat': lat}, mesh='flat')
+    plon = np.linspace(0.5, 9.5, npart)
+    plat = np.linspace(9.5, 0.5, npart)
+    for f in [fieldset.U, fieldset.V]:
+        f.interp_method = interp_method
+        with pytest.raises(Exception) as batch_error:
+            f.eval_batch(0, plon, plat, np.zeros(npart))
+        with pytest.raises(batch_error.type):
+            f.eval(0, plon[0], plat[0], 0.)
+
+
 @pytest.mark.parametrize('mode', ['scipy', 'jit'])
 def test_variable_init_from_field(mode, npart=9):
     dims = (2, 2)
@@ -383,3 +413,18 @@ def test_sampling_multiple_grid_sizes(mode):
 
     pset.execute(AdvectionRK4, runtime=10, dt=1)
     assert np.isclose(pset[0].lon, 0.8)
+
+
+@pytest.mark.parametrize('mode', ['scipy', 'jit'])
+def test_sampling_noncontiguous_grid(mode, k_sample_p, xdim=10, ydim=20):
+    """Sampling test for a FieldSet whose grid axes are strided views"""
+    lon = np.linspace(0., 1., 2*xdim, dtype=np.float32)[::2]
+    lat = np.linspace(0., 1., 2*ydim, dtype=np.float32)[::2]
+    P, _ = np.meshgrid(lat, lon)
+    fieldset = FieldSet.from_data({'U': np.zeros((xdim, ydim), dtype=np.float32),
+                                   'V': np.zeros((xdim, ydim), dtype=np.float32),
+                                   'P': np.array(P, dtype=np.float32)},
+                                  {'lon': lon, 'lat': lat}, mesh='flat', transpose=True)
+    pset = ParticleSet(fieldset, pclass=pclass(mode), lon=[0.5], lat=[0.35])
+    pset.execute(k_sample_p, endtime=1., dt=1.)
+    assert np.isclose(pset[0].p, 0.35)
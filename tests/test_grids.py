@@ -8,6 +8,23 @@ from os import path
 from datetime import timedelta as delta
 
 ptype = {'scipy': ScipyParticle, 'jit': JITParticle}
+data_path = path.join(path.dirname(__file__), 'test_data/')
+
+
+@pytest.fixture(scope='module')
+def rotation_angles_filename():
+    """Rotation angles of the NEMO test mesh, computed once for all NEMO tests"""
+    mesh_filename = data_path + 'mask_nemo_cross_180lon.nc'
+    rotation_angles_filename = data_path + 'rotation_angles_nemo_cross_180lon.nc'
+    variables = {'cosU': 'cosU',
+                 'sinU': 'sinU',
+                 'cosV': 'cosV',
+                 'sinV': 'sinV'}
+    dimensions = {'U': {'lon': 'glamu', 'lat': 'gphiu'},
+                  'V': {'lon': 'glamv', 'lat': 'gphiv'},
+                  'F': {'lon': 'glamf', 'lat': 'gphif'}}
+    compute_curvilinearGrid_rotationAngles(mesh_filename, rotation_angles_filename, variables, dimensions)
+    return rotation_angles_filename
 
 
 @pytest.mark.parametrize('mode', ['scipy', 'jit'])
@@ -37,24 +54,21 @@ def test_multi_structured_grids(mode):
     time_g1 = np.linspace(0., 1000., 2, dtype=np.float64)
     grid_1 = RectilinearZGrid(lon_g1, lat_g1, time=time_g1)
 
-    u_data = np.ones((lon_g0.size, lat_g0.size, time_g0.size), dtype=np.float32)
+    # Field data is built directly in the (time, lat, lon) layout
+    u_data = np.ones((time_g0.size, lat_g0.size, lon_g0.size), dtype=np.float32)
     u_data = 2*u_data
-    u_field = Field('U', u_data, grid=grid_0, transpose=True)
+    u_field = Field('U', u_data, grid=grid_0, transpose=False)
 
-    temp0_data = np.empty((lon_g0.size, lat_g0.size, time_g0.size), dtype=np.float32)
-    for i in range(lon_g0.size):
-        for j in range(lat_g0.size):
-            temp0_data[i, j, :] = temp_func(lon_g0[i], lat_g0[j])
-    temp0_field = Field('temp0', temp0_data, grid=grid_0, transpose=True)
+    temp0_data = np.empty((time_g0.size, lat_g0.size, lon_g0.size), dtype=np.float32)
+    temp0_data[:] = temp_func(lon_g0[None, :], lat_g0[:, None])[None, :, :]
+    temp0_field = Field('temp0', temp0_data, grid=grid_0, transpose=False)
 
-    v_data = np.zeros((lon_g1.size, lat_g1.size, time_g1.size), dtype=np.float32)
-    v_field = Field('V', v_data, grid=grid_1, transpose=True)
+    v_data = np.zeros((time_g1.size, lat_g1.size, lon_g1.size), dtype=np.float32)
+    v_field = Field('V', v_data, grid=grid_1, transpose=False)
 
-    temp1_data = np.empty((lon_g1.size, lat_g1.size, time_g1.size), dtype=np.float32)
-    for i in range(lon_g1.size):
-        for j in range(lat_g1.size):
-            temp1_data[i, j, :] = temp_func(lon_g1[i], lat_g1[j])
-    temp1_field = Field('temp1', temp1_data, grid=grid_1, transpose=True)
+    temp1_data = np.empty((time_g1.size, lat_g1.size, lon_g1.size), dtype=np.float32)
+    temp1_data[:] = temp_func(lon_g1[None, :], lat_g1[:, None])[None, :, :]
+    temp1_field = Field('temp1', temp1_data, grid=grid_1, transpose=False)
 
     other_fields = {}
     other_fields['temp0'] = temp0_field
@@ -77,7 +91,7 @@ def test_multi_structured_grids(mode):
 
     pset.execute(AdvectionRK4 + pset.Kernel(sampleTemp), runtime=1, dt=1)
 
-    assert np.allclose(pset.particles[0].temp0, pset.particles[0].temp1, atol=1e-3)
+    assert abs(pset.particles[0].temp0 - pset.particles[0].temp1) < 1e-3
 
 
 def test_avoid_repeated_grids():
@@ -92,13 +106,13 @@ def test_avoid_repeated_grids():
     time_g1 = np.linspace(0, 1000, 2, dtype=np.float64)
     grid_1 = RectilinearZGrid(lon_g1, lat_g1, time=time_g1)
 
-    u_data = np.zeros((lon_g0.size, lat_g0.size, time_g0.size), dtype=np.float32)
-    u_field = Field('U', u_data, grid=grid_0, transpose=True)
+    u_data = np.zeros((time_g0.size, lat_g0.size, lon_g0.size), dtype=np.float32)
+    u_field = Field('U', u_data, grid=grid_0, transpose=False)
 
-    v_data = np.zeros((lon_g1.size, lat_g1.size, time_g1.size), dtype=np.float32)
-    v_field = Field('V', v_data, grid=grid_1, transpose=True)
+    v_data = np.zeros((time_g1.size, lat_g1.size, lon_g1.size), dtype=np.float32)
+    v_field = Field('V', v_data, grid=grid_1, transpose=False)
 
-    temp0_field = Field('temp', u_data, lon=lon_g0, lat=lat_g0, time=time_g0, transpose=True)
+    temp0_field = Field('temp', u_data, lon=lon_g0, lat=lat_g0, time=time_g0, transpose=False)
 
     other_fields = {}
     other_fields['temp0'] = temp0_field
@@ -119,20 +133,18 @@ def test_multigrids_pointer(mode):
         return lon / 1000. + 10
     bath = bath_func(lon_g0)
 
-    for i in range(depth_g0.shape[0]):
-        for k in range(depth_g0.shape[2]):
-            depth_g0[i, :, k] = bath[i] * k / (depth_g0.shape[2]-1)
+    depth_g0[:] = bath[:, None, None] * np.arange(depth_g0.shape[2])[None, None, :] / (depth_g0.shape[2]-1)
 
     grid_0 = RectilinearSGrid(lon_g0, lat_g0, depth=depth_g0)
     grid_1 = RectilinearSGrid(lon_g0, lat_g0, depth=depth_g0)
 
-    u_data = np.zeros((lon_g0.size, lat_g0.size, depth_g0.shape[2]), dtype=np.float32)
-    v_data = np.zeros((lon_g0.size, lat_g0.size, depth_g0.shape[2]), dtype=np.float32)
-    w_data = np.zeros((lon_g0.size, lat_g0.size, depth_g0.shape[2]), dtype=np.float32)
+    u_data = np.zeros((depth_g0.shape[2], lat_g0.size, lon_g0.size), dtype=np.float32)
+    v_data = np.zeros((depth_g0.shape[2], lat_g0.size, lon_g0.size), dtype=np.float32)
+    w_data = np.zeros((depth_g0.shape[2], lat_g0.size, lon_g0.size), dtype=np.float32)
 
-    u_field = Field('U', u_data, grid=grid_0, transpose=True)
-    v_field = Field('V', v_data, grid=grid_0, transpose=True)
-    w_field = Field('W', w_data, grid=grid_1, transpose=True)
+    u_field = Field('U', u_data, grid=grid_0, transpose=False)
+    v_field = Field('V', v_data, grid=grid_0, transpose=False)
+    w_field = Field('W', w_data, grid=grid_1, transpose=False)
 
     field_set = FieldSet(u_field, v_field, fields={'W': w_field})
     assert(u_field.grid == v_field.grid)
@@ -162,23 +174,18 @@ def test_rectilinear_s_grid_sampling(mode, z4d):
         return bath
     bath = bath_func(lon_g0)
 
-    for i in range(depth_g0.shape[0]):
-        for k in range(depth_g0.shape[2]):
-            if z4d:
-                depth_g0[i, :, k, :] = bath[i] * k / (depth_g0.shape[2]-1)
-            else:
-                depth_g0[i, :, k] = bath[i] * k / (depth_g0.shape[2]-1)
+    depth_rel = bath[:, None, None] * np.arange(depth_g0.shape[2])[None, None, :] / (depth_g0.shape[2]-1)
+    depth_g0[:] = depth_rel[:, :, :, None] if z4d else depth_rel
 
     grid = RectilinearSGrid(lon_g0, lat_g0, depth=depth_g0, time=time_g0)
 
-    u_data = np.zeros((lon_g0.size, lat_g0.size, depth_g0.shape[2], time_g0.size), dtype=np.float32)
-    v_data = np.zeros((lon_g0.size, lat_g0.size, depth_g0.shape[2], time_g0.size), dtype=np.float32)
-    temp_data = np.zeros((lon_g0.size, lat_g0.size, depth_g0.shape[2], time_g0.size), dtype=np.float32)
-    for k in range(1, depth_g0.shape[2]):
-        temp_data[:, :, k, :] = k / (depth_g0.shape[2]-1.)
-    u_field = Field('U', u_data, grid=grid, transpose=True)
-    v_field = Field('V', v_data, grid=grid, transpose=True)
-    temp_field = Field('temp', temp_data, grid=grid, transpose=True)
+    u_data = np.zeros((time_g0.size, depth_g0.shape[2], lat_g0.size, lon_g0.size), dtype=np.float32)
+    v_data = np.zeros((time_g0.size, depth_g0.shape[2], lat_g0.size, lon_g0.size), dtype=np.float32)
+    temp_data = np.zeros((time_g0.size, depth_g0.shape[2], lat_g0.size, lon_g0.size), dtype=np.float32)
+    temp_data[:] = (np.arange(depth_g0.shape[2]) / (depth_g0.shape[2]-1.))[None, :, None, None]
+    u_field = Field('U', u_data, grid=grid, transpose=False)
+    v_field = Field('V', v_data, grid=grid, transpose=False)
+    temp_field = Field('temp', temp_data, grid=grid, transpose=False)
 
     other_fields = {}
     other_fields['temp'] = temp_field
@@ -196,7 +203,7 @@ def test_rectilinear_s_grid_sampling(mode, z4d):
     pset = ParticleSet.from_list(field_set, MyParticle, lon=[lon], lat=[lat], depth=[bath_func(lon)*ratio])
 
     pset.execute(pset.Kernel(sampleTemp), runtime=0, dt=0)
-    assert np.allclose(pset.particles[0].temp, ratio, atol=1e-4)
+    assert abs(pset.particles[0].temp - ratio) < 1e-4
 
 
 @pytest.mark.parametrize('mode', ['scipy', 'jit'])
@@ -210,34 +217,32 @@ def test_rectilinear_s_grids_advect1(mode):
         return lon / 1000. + 10
     bath = bath_func(lon_g0)
 
-    for i in range(depth_g0.shape[0]):
-        for k in range(depth_g0.shape[2]):
-            depth_g0[i, :, k] = bath[i] * k / (depth_g0.shape[2]-1)
+    depth_g0[:] = bath[:, None, None] * np.arange(depth_g0.shape[2])[None, None, :] / (depth_g0.shape[2]-1)
 
     grid = RectilinearSGrid(lon_g0, lat_g0, depth=depth_g0)
 
-    u_data = np.zeros((lon_g0.size, lat_g0.size, depth_g0.shape[2]), dtype=np.float32)
-    v_data = np.zeros((lon_g0.size, lat_g0.size, depth_g0.shape[2]), dtype=np.float32)
-    w_data = np.zeros((lon_g0.size, lat_g0.size, depth_g0.shape[2]), dtype=np.float32)
-    for i in range(depth_g0.shape[0]):
-        u_data[i, :, :] = 1 * 10 / bath[i]
-        for k in range(depth_g0.shape[2]):
-            w_data[i, :, k] = u_data[i, :, k] * depth_g0[i, :, k] / bath[i] * 1e-3
+    u_data = np.zeros((depth_g0.shape[2], lat_g0.size, lon_g0.size), dtype=np.float32)
+    v_data = np.zeros((depth_g0.shape[2], lat_g0.size, lon_g0.size), dtype=np.float32)
+    w_data = np.zeros((depth_g0.shape[2], lat_g0.size, lon_g0.size), dtype=np.float32)
+    u_data[:] = (1 * 10 / bath)[None, None, :]
+    w_data[:] = u_data * depth_g0.T / bath[None, None, :] * 1e-3
 
-    u_field = Field('U', u_data, grid=grid, transpose=True)
-    v_field = Field('V', v_data, grid=grid, transpose=True)
-    w_field = Field('W', w_data, grid=grid, transpose=True)
+    u_field = Field('U', u_data, grid=grid, transpose=False)
+    v_field = Field('V', v_data, grid=grid, transpose=False)
+    w_field = Field('W', w_data, grid=grid, transpose=False)
 
     field_set = FieldSet(u_field, v_field, fields={'W': w_field})
 
     lon = np.zeros((11))
     lat = np.zeros((11))
-    ratio = [min(i/10., .99) for i in range(11)]
+    ratio = np.minimum(np.arange(11)/10., .99)
     depth = bath_func(lon)*ratio
     pset = ParticleSet.from_list(field_set, ptype[mode], lon=lon, lat=lat, depth=depth)
 
     pset.execute(AdvectionRK4_3D, runtime=10000, dt=500)
-    assert np.allclose([p.depth/bath_func(p.lon) for p in pset], ratio)
+    depths = np.array([p.depth for p in pset])
+    lons = np.array([p.lon for p in pset])
+    assert np.allclose(depths / bath_func(lons), ratio)
 
 
 @pytest.mark.parametrize('mode', ['scipy', 'jit'])
@@ -251,21 +256,18 @@ def test_rectilinear_s_grids_advect2(mode):
         return lon / 1000. + 10
     bath = bath_func(lon_g0)
 
-    for i in range(depth_g0.shape[0]):
-        for k in range(depth_g0.shape[2]):
-            depth_g0[i, :, k] = bath[i] * k / (depth_g0.shape[2]-1)
+    depth_g0[:] = bath[:, None, None] * np.arange(depth_g0.shape[2])[None, None, :] / (depth_g0.shape[2]-1)
 
     grid = RectilinearSGrid(lon_g0, lat_g0, depth=depth_g0)
 
-    u_data = np.zeros((lon_g0.size, lat_g0.size, depth_g0.shape[2]), dtype=np.float32)
-    v_data = np.zeros((lon_g0.size, lat_g0.size, depth_g0.shape[2]), dtype=np.float32)
-    rel_depth_data = np.zeros((lon_g0.size, lat_g0.size, depth_g0.shape[2]), dtype=np.float32)
-    for k in range(1, depth_g0.shape[2]):
-        rel_depth_data[:, :, k] = k / (depth_g0.shape[2]-1.)
+    u_data = np.zeros((depth_g0.shape[2], lat_g0.size, lon_g0.size), dtype=np.float32)
+    v_data = np.zeros((depth_g0.shape[2], lat_g0.size, lon_g0.size), dtype=np.float32)
+    rel_depth_data = np.zeros((depth_g0.shape[2], lat_g0.size, lon_g0.size), dtype=np.float32)
+    rel_depth_data[:] = (np.arange(depth_g0.shape[2]) / (depth_g0.shape[2]-1.))[:, None, None]
 
-    u_field = Field('U', u_data, grid=grid, transpose=True)
-    v_field = Field('V', v_data, grid=grid, transpose=True)
-    rel_depth_field = Field('relDepth', rel_depth_data, grid=grid, transpose=True)
+    u_field = Field('U', u_data, grid=grid, transpose=False)
+    v_field = Field('V', v_data, grid=grid, transpose=False)
+    rel_depth_field = Field('relDepth', rel_depth_data, grid=grid, transpose=False)
     field_set = FieldSet(u_field, v_field, fields={'relDepth': rel_depth_field})
 
     class MyParticle(ptype[mode]):
@@ -291,9 +293,8 @@ def test_curvilinear_grids(mode):
     y = np.linspace(0, 1e3, 5, dtype=np.float32)
     (xx, yy) = np.meshgrid(x, y)
 
-    r = np.sqrt(xx*xx+yy*yy)
-    theta = np.arctan2(yy, xx)
-    theta = theta + np.pi/6.
+    r = np.hypot(xx, yy)
+    theta = np.arctan2(yy, xx) + np.pi/6.
 
     lon = r * np.cos(theta)
     lat = r * np.sin(theta)
@@ -302,7 +303,7 @@ def test_curvilinear_grids(mode):
 
     u_data = np.ones((2, y.size, x.size), dtype=np.float32)
     v_data = np.zeros((2, y.size, x.size), dtype=np.float32)
-    u_data[0, :, :] = lon[:, :] + lat[:, :]
+    np.add(lon, lat, out=u_data[0, :, :])
     u_field = Field('U', u_data, grid=grid, transpose=False)
     v_field = Field('V', v_data, grid=grid, transpose=False)
     field_set = FieldSet(u_field, v_field)
@@ -310,7 +311,7 @@ def test_curvilinear_grids(mode):
     def sampleSpeed(particle, fieldset, time, dt):
         u = fieldset.U[time, particle.lon, particle.lat, particle.depth]
         v = fieldset.V[time, particle.lon, particle.lat, particle.depth]
-        particle.speed = math.sqrt(u*u+v*v)
+        particle.speed = math.hypot(u, v)
 
     class MyParticle(ptype[mode]):
         speed = Variable('speed', dtype=np.float32, initial=0.)
@@ -321,13 +322,7 @@ def test_curvilinear_grids(mode):
 
 
 @pytest.mark.parametrize('mode', ['scipy', 'jit'])
-def test_nemo_grid(mode):
-    data_path = path.join(path.dirname(__file__), 'test_data/')
-
-    mesh_filename = data_path + 'mask_nemo_cross_180lon.nc'
-    rotation_angles_filename = data_path + 'rotation_angles_nemo_cross_180lon.nc'
-    compute_curvilinearGrid_rotationAngles(mesh_filename, rotation_angles_filename)
-
+def test_nemo_grid(mode, rotation_angles_filename):
     filenames = {'U': data_path + 'Uu_eastward_nemo_cross_180lon.nc',
                  'V': data_path + 'Vv_eastward_nemo_cross_180lon.nc',
                  'cosU': rotation_angles_filename,
@@ -368,20 +363,7 @@ def test_nemo_grid(mode):
 
 
 @pytest.mark.parametrize('mode', ['scipy', 'jit'])
-def test_advect_nemo(mode):
-    data_path = path.join(path.dirname(__file__), 'test_data/')
-
-    mesh_filename = data_path + 'mask_nemo_cross_180lon.nc'
-    rotation_angles_filename = data_path + 'rotation_angles_nemo_cross_180lon.nc'
-    variables = {'cosU': 'cosU',
-                 'sinU': 'sinU',
-                 'cosV': 'cosV',
-                 'sinV': 'sinV'}
-    dimensions = {'U': {'lon': 'glamu', 'lat': 'gphiu'},
-                  'V': {'lon': 'glamv', 'lat': 'gphiv'},
-                  'F': {'lon': 'glamf', 'lat': 'gphif'}}
-    compute_curvilinearGrid_rotationAngles(mesh_filename, rotation_angles_filename, variables, dimensions)
-
+def test_advect_nemo(mode, rotation_angles_filename):
     filenames = {'U': data_path + 'Uu_eastward_nemo_cross_180lon.nc',
                  'V': data_path + 'Vv_eastward_nemo_cross_180lon.nc',
                  'cosU': rotation_angles_filename,
@@ -1,9 +1,10 @@
 from parcels import (
     FieldSet, ParticleSet, ScipyParticle, JITParticle, ErrorCode, KernelError,
-    OutOfBoundsError
+    OutOfBoundsError, Variable, AdvectionRK4
 )
 import numpy as np
 import pytest
+import logging
 
 
 ptype = {'scipy': ScipyParticle, 'jit': JITParticle}
@@ -179,6 +180,42 @@ def test_execution_delete_out_of_bounds(fieldset, mode, npart=10):
     assert len(pset) == 0
 
 
+def test_execution_batch_recover_out_of_bounds(caplog, npart=10):
+    """Particles leaving the domain under the vectorised SciPy AdvectionRK4
+    get the same recovery as under the per-particle kernel"""
+    lon = np.linspace(0., 1., 20, dtype=np.float32)
+    lat = np.linspace(0., 1., 20, dtype=np.float32)
+    data = {'U': np.ones((lat.size, lon.size), dtype=np.float32),
+            'V': np.zeros((lat.size, lon.size), dtype=np.float32)}
+    fieldset = FieldSet.from_data(data, {'lon': lon, 'lat': lat}, mesh='flat')
+
+    class MyParticle(ScipyParticle):
+        nrecovered = Variable('nrecovered', dtype=np.int32, initial=0)
+
+    def MoveBack(particle, fieldset, time, dt):
+        particle.lon -= 0.5
+        particle.nrecovered += 1
+
+    psets = []
+    for batch in [True, False]:
+        pset = ParticleSet(fieldset, pclass=MyParticle,
+                           lon=np.linspace(0.05, 0.95, npart, dtype=np.float32),
+                           lat=0.5*np.ones(npart, dtype=np.float32))
+        # A merged kernel is not in kernel.batch_kernels, so it runs per particle
+        kernel = AdvectionRK4 if batch else pset.Kernel(AdvectionRK4) + pset.Kernel(DoNothing)
+        caplog.clear()
+        with caplog.at_level(logging.DEBUG, logger='parcels.loggers'):
+            pset.execute(kernel, endtime=1., dt=0.1,
+                         recovery={ErrorCode.ErrorOutOfBounds: MoveBack})
+        assert any('falls back to per-particle execution' in r.getMessage()
+                   for r in caplog.records) is batch
+        psets.append(pset)
+    assert all(p.nrecovered > 0 for p in psets[0])
+    for var in ['lon', 'lat', 'time', 'nrecovered']:
+        assert np.allclose([getattr(p, var) for p in psets[0]],
+                           [getattr(p, var) for p in psets[1]], rtol=1e-5)
+
+
 @pytest.mark.parametrize('mode', ['scipy', 'jit'])
 def test_kernel_add_no_new_variables(fieldset, mode):
     def MoveEast(particle, fieldset, time, dt):
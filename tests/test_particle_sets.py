@@ -1,8 +1,10 @@
 from parcels import (FieldSet, ParticleSet, Field, ScipyParticle, JITParticle,
-                     Variable, ErrorCode)
+                     Variable, ErrorCode, AdvectionRK4)
 import numpy as np
 import pytest
 from netCDF4 import Dataset
+from datetime import timedelta as delta
+from datetime import datetime
 
 ptype = {'scipy': ScipyParticle, 'jit': JITParticle}
 
@@ -66,6 +68,24 @@ def test_pset_create_with_time(fieldset, mode, npart=100):
     assert np.allclose([p.time for p in pset], time, rtol=1e-12)
 
 
+@pytest.mark.parametrize('mode', ['scipy', 'jit'])
+def test_pset_create_with_timedelta(fieldset, mode, npart=10):
+    lon = np.linspace(0, 1, npart, dtype=np.float32)
+    lat = np.linspace(1, 0, npart, dtype=np.float32)
+    times = np.arange(npart) * 60.
+    for time in [delta(seconds=60), [delta(seconds=t) for t in times],
+                 times.astype('timedelta64[s]'), (times * 1e9).astype('timedelta64[ns]')]:
+        pset = ParticleSet(fieldset, lon=lon, lat=lat, pclass=ptype[mode], time=time)
+        expected = 60. if isinstance(time, delta) else times
+        assert np.allclose([p.time for p in pset], expected, rtol=1e-12)
+
+    fieldset.U.grid.time_origin = datetime(2000, 1, 1)
+    for time in [[datetime(2000, 1, 1) + delta(seconds=t) for t in times],
+                 (np.datetime64('2000-01-01') + times.astype('timedelta64[s]')).astype('datetime64[ns]')]:
+        pset = ParticleSet(fieldset, lon=lon, lat=lat, pclass=ptype[mode], time=time)
+        assert np.allclose([p.time for p in pset], times, rtol=1e-12)
+
+
 @pytest.mark.parametrize('mode', ['scipy', 'jit'])
 def test_pset_repeated_release(fieldset, mode, npart=10):
     time = np.arange(0, npart, 1)  # release 1 particle every second
@@ -167,6 +187,22 @@ def test_pset_add_execute(fieldset, mode, npart=10):
     assert np.allclose(np.array([p.lat for p in pset]), 0.4, rtol=1e-12)
 
 
+@pytest.mark.parametrize('mode', ['scipy', 'jit'])
+def test_pset_add_remove_execute(fieldset, mode, npart=10):
+    def AddLat(particle, fieldset, time, dt):
+        particle.lat += 0.1
+
+    pset = ParticleSet(fieldset, lon=[0.1], lat=[0.], pclass=ptype[mode])
+    for i in range(1, npart):
+        pset.add(ParticleSet(fieldset, lon=[0.1], lat=[0.05 * i], pclass=ptype[mode]))
+        if i == npart // 2:
+            pset.remove(0)
+    lats = 0.05 * np.arange(1, npart)
+    assert np.allclose([p.lat for p in pset], lats, rtol=1e-5)
+    pset.execute(pset.Kernel(AddLat), runtime=1., dt=1.0)
+    assert np.allclose([p.lat for p in pset], lats + 0.1, rtol=1e-5)
+
+
 @pytest.mark.parametrize('mode', ['scipy', 'jit'])
 def test_pset_merge_inplace(fieldset, mode, npart=100):
     pset1 = ParticleSet(fieldset, pclass=ptype[mode],
@@ -208,6 +244,23 @@ def test_pset_remove_index(fieldset, mode, npart=100):
     assert(pset.size == 0)
 
 
+@pytest.mark.parametrize('mode', ['scipy', 'jit'])
+def test_pset_remove_indices_execute(fieldset, mode, npart=20):
+    def AddLat(particle, fieldset, time, dt):
+        particle.lat += 0.1
+
+    lon = np.linspace(0, 1, npart, dtype=np.float32)
+    lat = np.linspace(0, 0.5, npart, dtype=np.float32)
+    pset = ParticleSet(fieldset, lon=lon, lat=lat, pclass=ptype[mode])
+    removed = pset.remove([12, 3, 7])
+    assert np.allclose([p.lon for p in removed], lon[[12, 3, 7]], rtol=1e-12)
+    keep = np.delete(np.arange(npart), [3, 7, 12])
+    assert np.allclose([p.lon for p in pset], lon[keep], rtol=1e-12)
+    pset.execute(pset.Kernel(AddLat), runtime=1., dt=1.0)
+    assert np.allclose([p.lat for p in pset], lat[keep] + 0.1, rtol=1e-5)
+    assert np.allclose([p.lat for p in removed], lat[[12, 3, 7]], rtol=1e-12)
+
+
 @pytest.mark.xfail(reason="Particle removal has not been implemented yet")
 @pytest.mark.parametrize('mode', ['scipy', 'jit'])
 def test_pset_remove_particle(fieldset, mode, npart=100):
@@ -279,6 +332,27 @@ def test_density(fieldset, mode, area_scale):
             assert np.allclose(fieldset.U.lat[inds[i][0]], pset[i].lat, atol=fieldset.U.lat[1]-fieldset.U.lat[0])
 
 
+@pytest.mark.parametrize('mode', ['scipy', 'jit'])
+def test_density_particle_val(fieldset, mode, npart=50):
+    lon = np.random.uniform(0, 1, npart)
+    lat = np.random.uniform(-30, 30, npart)
+    weights = np.random.uniform(0, 1, npart)
+
+    class MyParticle(ptype[mode]):
+        weight = Variable('weight', dtype=np.float32)
+    pset = ParticleSet(fieldset, pclass=MyParticle, lon=lon, lat=lat)
+    arr = pset.density(particle_val=weights, relative=True)
+    expected = np.zeros_like(arr)
+    for p, w in zip(pset, weights):
+        _, _, _, xi, yi, _ = fieldset.U.search_indices(p.lon, p.lat, p.depth, 0, 0, search2D=True)
+        expected[yi, xi] += w / np.sum(weights)
+    assert np.allclose(arr, expected, rtol=1e-5)
+
+    for p, w in zip(pset, weights):
+        p.weight = w
+    assert np.allclose(pset.density(particle_val='weight', relative=True), expected, rtol=1e-5)
+
+
 @pytest.mark.parametrize('mode', ['scipy', 'jit'])
 def test_pfile_array_remove_particles(fieldset, mode, tmpdir, npart=10):
     filepath = tmpdir.join("pfile_array_remove_particles")
@@ -291,6 +365,141 @@ def test_pfile_array_remove_particles(fieldset, mode, tmpdir, npart=10):
     pfile.write(pset, 1)
 
 
+@pytest.mark.parametrize('mode', ['scipy', 'jit'])
+def test_pfile_array_write_values(fieldset, mode, tmpdir, npart=10):
+    filepath = tmpdir.join("pfile_array_write_values")
+
+    class MyParticle(ptype[mode]):
+        age = Variable('age', dtype=np.float32, initial=0.)
+    pset = ParticleSet(fieldset, pclass=MyParticle,
+                       lon=np.linspace(0, 1, npart, dtype=np.float32),
+                       lat=np.linspace(1, 0, npart, dtype=np.float32))
+    for i, p in enumerate(pset):
+        p.age = i
+    pfile = pset.ParticleFile(filepath)
+    pfile.write(pset, 0)
+    pset.remove(3)
+    pfile.write(pset, 1)
+    pfile.sync()
+    ncfile = Dataset(filepath+".nc", 'r', 'NETCDF4')
+    inds = [p.fileid for p in pset]
+    assert np.allclose(ncfile.variables['lon'][inds, 1], [p.lon for p in pset])
+    assert np.allclose(ncfile.variables['lat'][inds, 1], [p.lat for p in pset])
+    assert np.allclose(ncfile.variables['age'][inds, 1], [p.age for p in pset])
+    assert np.all(ncfile.variables['trajectory'][inds, 1] == [p.id for p in pset])
+    ncfile.close()
+
+
+@pytest.mark.parametrize('mode', ['scipy', 'jit'])
+@pytest.mark.parametrize('buffersize', [1, 7, 2**20])
+@pytest.mark.parametrize('background_flush', [False, True])
+def test_pfile_buffered_write(fieldset, mode, tmpdir, buffersize, background_flush, npart=5):
+    filepath = tmpdir.join("pfile_buffered_write")
+    pset = ParticleSet(fieldset, pclass=ptype[mode],
+                       lon=np.linspace(0, 1, npart, dtype=np.float32),
+                       lat=0.5*np.ones(npart, dtype=np.float32))
+    pfile = pset.ParticleFile(filepath, buffersize=buffersize, background_flush=background_flush)
+    for t in range(4):
+        for p in pset:
+            p.lat = t
+        if t == 2:
+            pset.remove(1)
+        pfile.write(pset, t, sync=False)
+    pfile.sync()
+    ncfile = Dataset(filepath+".nc", 'r', 'NETCDF4')
+    lat = ncfile.variables['lat'][:]
+    time = ncfile.variables['time'][:]
+    assert lat.shape == (npart, 4)
+    assert np.allclose(lat[0, :], range(4))
+    assert np.allclose(lat[1, :2], range(2)) and np.all(lat.mask[1, 2:])
+    assert np.allclose(time[0, :], range(4))
+    ncfile.close()
+
+
+@pytest.mark.parametrize('finish', ['sync', 'close'])
+def test_pfile_background_flush_error(fieldset, tmpdir, finish, npart=5):
+    class FailingVariable(object):
+        def __setitem__(self, key, value):
+            raise RuntimeError("put failed")
+
+    filepath = tmpdir.join("pfile_background_flush_error")
+    pset = ParticleSet(fieldset, pclass=ScipyParticle,
+                       lon=np.linspace(0, 1, npart, dtype=np.float32),
+                       lat=0.5*np.ones(npart, dtype=np.float32))
+    pfile = pset.ParticleFile(filepath, background_flush=True)
+    pfile._ncvars.append((FailingVariable(), 'lat'))
+    pfile.write(pset, 0, sync=False)
+    pfile.flush()
+    with pytest.raises(RuntimeError):
+        getattr(pfile, finish)()
+    pfile.close()  # the error is only raised once
+    assert not pfile.dataset.isopen()
+
+
+@pytest.mark.parametrize('flush_on_sync', [True, False])
+def test_pfile_flush_on_sync(fieldset, tmpdir, flush_on_sync, npart=10):
+    filepath = tmpdir.join("pfile_flush_on_sync")
+    pset = ParticleSet(fieldset, pclass=ScipyParticle,
+                       lon=np.linspace(0, 1, npart, dtype=np.float32),
+                       lat=0.5*np.ones(npart, dtype=np.float32))
+    pfile = pset.ParticleFile(filepath, outputdt=0.1, flush_on_sync=flush_on_sync)
+    pfile.write(pset, 0)
+    ncfile = Dataset(filepath+".nc", 'r', 'NETCDF4')
+    nobs = ncfile.variables['lat'].shape[1] if 'lat' in ncfile.variables else 0
+    assert nobs == (1 if flush_on_sync else 0)
+    ncfile.close()
+    pset.execute(AdvectionRK4, runtime=0.3, dt=0.1, output_file=pfile)
+    ncfile = Dataset(filepath+".nc", 'r', 'NETCDF4')
+    assert np.allclose(ncfile.variables['time'][0, :], [0, 0.1, 0.2, 0.3])
+    ncfile.close()
+
+
+@pytest.mark.parametrize('zlib', [False, True])
+def test_pfile_chunking(fieldset, tmpdir, zlib, npart=10):
+    filepath = tmpdir.join("pfile_chunking")
+    pset = ParticleSet(fieldset, pclass=ScipyParticle,
+                       lon=np.linspace(0, 1, npart, dtype=np.float32),
+                       lat=0.5*np.ones(npart, dtype=np.float32))
+    pfile = pset.ParticleFile(filepath, chunksizes=(npart, 4), zlib=zlib)
+    for t in range(6):
+        pfile.write(pset, t)
+    ncfile = Dataset(filepath+".nc", 'r', 'NETCDF4')
+    assert ncfile.variables['lat'].chunking() == [npart, 4]
+    assert ncfile.variables['lat'].filters()['zlib'] is zlib
+    assert np.allclose(ncfile.variables['lon'][:, 5], [p.lon for p in pset])
+    ncfile.close()
+
+
+def test_pfile_quantize(fieldset, tmpdir, npart=10):
+    filepath = tmpdir.join("pfile_quantize")
+    pset = ParticleSet(fieldset, pclass=ScipyParticle,
+                       lon=np.linspace(0, 1, npart, dtype=np.float32),
+                       lat=np.linspace(1, 0, npart, dtype=np.float32))
+    pfile = pset.ParticleFile(filepath, quantize={'lat': 2})
+    pfile.write(pset, 0)
+    ncfile = Dataset(filepath+".nc", 'r', 'NETCDF4')
+    assert ncfile.variables['lat'].filters()['zlib']
+    assert not ncfile.variables['lon'].filters()['zlib']
+    assert np.allclose(ncfile.variables['lat'][:, 0], [p.lat for p in pset], atol=1e-2)
+    assert np.allclose(ncfile.variables['lon'][:, 0], [p.lon for p in pset], atol=1e-7)
+    ncfile.close()
+
+
+def test_pfile_context_manager(fieldset, tmpdir, npart=10):
+    filepath = tmpdir.join("pfile_context_manager")
+    pset = ParticleSet(fieldset, pclass=ScipyParticle,
+                       lon=np.linspace(0, 1, npart, dtype=np.float32),
+                       lat=0.5*np.ones(npart, dtype=np.float32))
+    with pset.ParticleFile(filepath) as pfile:
+        for t in range(3):
+            pfile.write(pset, t, sync=False)
+    assert not pfile.dataset.isopen()
+    pfile.close()
+    ncfile = Dataset(filepath+".nc", 'r', 'NETCDF4')
+    assert np.allclose(ncfile.variables['time'][:], [range(3)] * npart)
+    ncfile.close()
+
+
 @pytest.mark.parametrize('mode', ['scipy', 'jit'])
 def test_pfile_array_remove_all_particles(fieldset, mode, tmpdir, npart=10):
 
@@ -356,3 +565,60 @@ def test_variable_written_ondelete(fieldset, mode, tmpdir, npart=3):
     ncfile = Dataset(filepath+".nc", 'r', 'NETCDF4')
     lon = ncfile.variables['lon'][:]
     assert (lon.size == noutside)
+
+
+@pytest.mark.parametrize('mode', ['scipy', 'jit'])
+def test_pfile_buffered_ondelete(fieldset, mode, tmpdir, npart=10):
+    """Particles deleted one by one give a sparse buffer, which is written record by record"""
+    def move_west(particle, fieldset, time, dt):
+        tmp = fieldset.U[time, particle.lon, particle.lat, particle.depth]  # to trigger out-of-bounds error
+        particle.lon -= 0.1 + tmp
+
+    def DeleteP(particle, fieldset, time, dt):
+        particle.delete()
+
+    output = {}
+    for flush_on_sync in [True, False]:
+        filepath = tmpdir.join("pfile_buffered_ondelete_%s" % flush_on_sync)
+        pset = ParticleSet(fieldset, pclass=ptype[mode],
+                           lon=np.linspace(0.05, 0.95, npart, dtype=np.float32),
+                           lat=0.5*np.ones(npart, dtype=np.float32))
+        pfile = pset.ParticleFile(filepath, outputdt=0.1, write_ondelete=True, flush_on_sync=flush_on_sync)
+        pset.execute(pset.Kernel(move_west), runtime=1.1, dt=0.1, output_file=pfile,
+                     recovery={ErrorCode.ErrorOutOfBounds: DeleteP})
+        pfile.sync()
+        ncfile = Dataset(filepath+".nc", 'r', 'NETCDF4')
+        output[flush_on_sync] = dict((v, ncfile.variables[v][:]) for v in ['trajectory', 'time', 'lon'])
+        ncfile.close()
+
+    time = output[False]['time']
+    assert time.shape == (npart, npart)
+    assert np.all(np.sum(~np.isnan(time), axis=1) == 1)
+    assert np.all(np.diff(np.nanmax(time, axis=1)) > 0)  # deleted one after the other
+    for v in ['time', 'lon']:
+        assert np.array_equal(np.isnan(output[True][v]), np.isnan(output[False][v]))
+        assert np.allclose(output[True][v], output[False][v], equal_nan=True)
+    # particle ids differ between the two ParticleSets, but not their order in the file
+    ids = [output[f]['trajectory'].compressed() for f in [True, False]]
+    assert np.all(ids[0] - ids[0][0] == ids[1] - ids[1][0])
+
+
+@pytest.mark.parametrize('mode', ['scipy', 'jit'])
+def test_pfile_sparse_runs(fieldset, mode, tmpdir, npart=10):
+    """Sparse buffers are written as runs of consecutive rows, in any particle order"""
+    filepath = tmpdir.join("pfile_sparse_runs")
+    pset = ParticleSet(fieldset, pclass=ptype[mode],
+                       lon=np.linspace(0, 1, npart, dtype=np.float32),
+                       lat=np.arange(npart, dtype=np.float32))
+    pfile = pset.ParticleFile(filepath)
+    pfile._max_block_ratio = 0  # force record-by-record flushes
+    pfile.write(pset, 0)
+    subset = pset.particles[[7, 6, 0, 1, 2, 9, 4]]
+    pfile.write(subset, 1)
+    ncfile = Dataset(filepath+".nc", 'r', 'NETCDF4')
+    lat = ncfile.variables['lat'][:]
+    assert np.allclose(lat[:, 0], range(npart))
+    written = [p.fileid for p in subset]
+    assert np.allclose(lat[written, 1], [p.lat for p in subset])
+    assert np.all(lat.mask[[3, 5, 8], 1])
+    ncfile.close()